@@ -0,0 +1,103 @@
+import json
+import threading
+
+try:
+    from BaseHTTPServer import BaseHTTPRequestHandler, HTTPServer
+    from SocketServer import ThreadingMixIn
+except ImportError:
+    from http.server import BaseHTTPRequestHandler, HTTPServer
+    from socketserver import ThreadingMixIn
+
+import pytest
+
+
+class _Server(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+class StubServer(object):
+    """
+    A local HTTP server standing in for the API. ``routes`` maps path prefixes
+    to functions of the request returning ``(status, headers, body)``, each
+    request's ``(method, path)`` is appended to ``log``.
+    """
+    def __init__(self):
+        self.routes = {}
+        self.log = []
+        self._lock = threading.Lock()
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # A connection per request, so none are left open once the
+            # server is shut down.
+            protocol_version = 'HTTP/1.0'
+
+            def log_message(self, *args):
+                pass
+
+            def _handle(self):
+                with stub._lock:
+                    stub.log.append((self.command, self.path))
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+
+                path = self.path.split('?')[0]
+                # The longest matching prefix wins.
+                for prefix in sorted(stub.routes, key=len, reverse=True):
+                    if path.startswith(prefix):
+                        status, headers, body = stub.routes[prefix](self)
+                        break
+                else:
+                    status, headers, body = 404, {}, '{"error": {"description": "not found"}}'
+
+                body = body.encode('utf-8') if not isinstance(body, bytes) else body
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _handle
+
+        self._server = _Server(('127.0.0.1', 0), Handler)
+        self.url = 'http://127.0.0.1:{0}/'.format(self._server.server_port)
+        thread = threading.Thread(target=self._server.serve_forever)
+        thread.daemon = True
+        thread.start()
+
+    @staticmethod
+    def fantasy_content(content):
+        """A route answering with the given content, wrapped as the API does."""
+        body = json.dumps({'fantasy_content': content})
+        return lambda request: (200, {'Content-Type': 'application/json'}, body)
+
+    def requests(self, prefix=''):
+        """The paths requested which start with prefix."""
+        with self._lock:
+            return [path for _, path in self.log if path.startswith(prefix)]
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub():
+    server = StubServer()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def authfile(tmpdir):
+    """An authorization file with an access token, requests to a stub aren't verified."""
+    path = str(tmpdir.join('auth.json'))
+    with open(path, 'w') as f:
+        json.dump({'consumer_key': 'key', 'consumer_secret': 'secret',
+                   'oauth_access_token': 'token',
+                   'oauth_access_token_secret': 'secret',
+                   'oauth_session_handle': 'handle'}, f)
+    return path
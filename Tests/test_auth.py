@@ -0,0 +1,78 @@
+import json
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from YHandler.AuthManager import JsonAuthManager, LockingJsonAuthManager, fcntl
+
+
+@pytest.fixture
+def auth_path(tmpdir):
+    path = str(tmpdir.join('auth.json'))
+    with open(path, 'w') as f:
+        json.dump({'oauth_access_token': 'token', 'count': 0}, f)
+    return path
+
+
+def test_write_replaces_the_file(auth_path):
+    manager = LockingJsonAuthManager(auth_path)
+    manager.write_authvals({'oauth_access_token': 'new'})
+
+    with open(auth_path) as f:
+        assert json.load(f) == {'oauth_access_token': 'new'}
+    # No temporary file is left behind.
+    assert sorted(os.listdir(os.path.dirname(auth_path))) == ['auth.json']
+
+
+def test_values_are_cached(auth_path, monkeypatch):
+    manager = LockingJsonAuthManager(auth_path)
+    reads = []
+    read = JsonAuthManager.get_authvals
+
+    def counting_read(self):
+        reads.append(self)
+        return read(self)
+    monkeypatch.setattr(JsonAuthManager, 'get_authvals', counting_read)
+
+    assert manager.get_authvals()['oauth_access_token'] == 'token'
+    assert manager.get_authvals()['oauth_access_token'] == 'token'
+    assert len(reads) == 1
+
+
+def test_write_in_the_same_tick_is_seen(auth_path):
+    # As on a filesystem with a timestamp resolution of a second.
+    mtime = int(time.time())
+    os.utime(auth_path, (mtime, mtime))
+    manager = LockingJsonAuthManager(auth_path)
+    assert manager.get_authvals()['oauth_access_token'] == 'token'
+
+    # Another process replaces the file, with a timestamp which didn't change.
+    LockingJsonAuthManager(auth_path).write_authvals({'oauth_access_token': 'other'})
+    os.utime(auth_path, (mtime, mtime))
+    assert manager.get_authvals()['oauth_access_token'] == 'other'
+
+
+def _increment(auth_path, times):
+    """Increment the count in the file under the lock, as a token refresh would."""
+    manager = LockingJsonAuthManager(auth_path)
+    for _ in range(times):
+        with manager.lock():
+            authd = manager.get_authvals()
+            time.sleep(0.01)
+            authd['count'] += 1
+            manager.write_authvals(authd)
+
+
+@pytest.mark.skipif(fcntl is None, reason='processes are only locked out with fcntl')
+def test_lock_excludes_other_processes(auth_path):
+    workers = [multiprocessing.Process(target=_increment, args=(auth_path, 10))
+               for _ in range(2)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert [w.exitcode for w in workers] == [0, 0]
+    assert LockingJsonAuthManager(auth_path).get_authvals()['count'] == 20
@@ -0,0 +1,93 @@
+import pytest
+
+from YHandler import cache
+from YHandler.cache import LRUCache, ResponseCache, SQLiteCache
+
+RULES = [(r'^game/', 60), (r'^league/[^/]+/teams$', 10)]
+
+
+class FakeClock(object):
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(cache, 'time', clock)
+    return clock
+
+
+@pytest.fixture
+def disk(tmpdir):
+    disk = SQLiteCache(str(tmpdir.join('cache.db')))
+    yield disk
+    disk.close()
+
+
+def test_ttl_expiry(clock):
+    responses = ResponseCache(rules=RULES)
+    responses.set('league/371.l.1/teams', {'teams': 1})
+    responses.set('league/371.l.1/players', {'players': 1})
+
+    assert responses.get('league/371.l.1/teams') == {'teams': 1}
+    # Only query strings with a rule are cached.
+    assert responses.get('league/371.l.1/players') is None
+
+    clock.now += 10
+    assert responses.get('league/371.l.1/teams') is None
+    assert responses.memory.keys() == []
+
+
+def test_hits_are_copies(clock):
+    responses = ResponseCache(rules=RULES)
+    responses.set('game/nfl', {'game': [1]})
+    responses.get('game/nfl')['game'].append(2)
+    assert responses.get('game/nfl') == {'game': [1]}
+
+
+def test_lru_eviction():
+    memory = LRUCache(maxsize=2)
+    memory.set('a', 'A', 0)
+    memory.set('b', 'B', 0)
+    # Using a makes b the least recently used.
+    memory.get('a')
+    memory.set('c', 'C', 0)
+
+    assert memory.get('b') is None
+    assert memory.get('a') == ('A', 0)
+    assert memory.get('c') == ('C', 0)
+
+
+def test_promotion_from_disk(clock, disk):
+    ResponseCache(memory=LRUCache(), disk=disk, rules=RULES).set('game/nfl', {'game': 1})
+
+    # E.g. after a restart, the result is only on disk.
+    responses = ResponseCache(memory=LRUCache(), disk=disk, rules=RULES)
+    assert responses.memory.get('game/nfl') is None
+    assert responses.get('game/nfl') == {'game': 1}
+    value, expires = responses.memory.get('game/nfl')
+    assert expires == clock.now + 60
+
+    # Expired entries are removed from disk too.
+    clock.now += 60
+    responses.memory.clear()
+    assert responses.get('game/nfl') is None
+    assert disk.keys() == []
+
+
+def test_invalidate(clock, disk):
+    responses = ResponseCache(memory=LRUCache(), disk=disk, rules=RULES)
+    for querystring in ('game/nfl', 'game/nhl', 'league/371.l.1/teams'):
+        responses.set(querystring, {})
+
+    responses.invalidate('^game/nfl')
+    for tier in (responses.memory, disk):
+        assert sorted(tier.keys()) == ['game/nhl', 'league/371.l.1/teams']
+
+    responses.invalidate()
+    assert responses.memory.keys() == []
+    assert disk.keys() == []
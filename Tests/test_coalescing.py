@@ -0,0 +1,42 @@
+import threading
+import time
+
+from YHandler import YahooFantasySports
+
+ROSTER = {'team': [[{'team_key': '371.l.1234.t.1'}],
+                   {'roster': {'coverage_type': 'week', 'week': '1',
+                               '0': {'players': {'count': 0}}}}]}
+
+
+def test_concurrent_identical_requests(stub, authfile):
+    handler = YahooFantasySports(authfile, base_url=stub.url)
+    respond = stub.fantasy_content(ROSTER)
+
+    def slow_roster(request):
+        # Answer once the second request is waiting for this one.
+        deadline = time.time() + 5
+        while time.time() < deadline:
+            with handler._inflight_lock:
+                if any(f.followers for f in handler._inflight.values()):
+                    break
+            time.sleep(0.01)
+        return respond(request)
+    stub.routes['/team/371.l.1234.t.1/roster'] = slow_roster
+
+    results = [None, None]
+
+    def fetch(i):
+        results[i] = handler.api_req('team/371.l.1234.t.1/roster')
+    threads = [threading.Thread(target=fetch, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(stub.requests('/team/')) == 1
+
+    # Building a roster pops from its data, which mustn't affect the other result.
+    first, second = [r['team'][1]['roster'] for r in results]
+    assert first is not second
+    first.pop('0')
+    assert '0' in second
@@ -0,0 +1,70 @@
+import json
+import threading
+import time
+
+from YHandler.concurrency import AsyncYahooFantasySports
+from YHandler.resources import YahooTeamResource
+
+NUM_TEAMS = 12
+MAX_CONCURRENCY = 3
+
+
+class InFlight(object):
+    """Counts the requests being answered at once."""
+    def __init__(self):
+        self.current = 0
+        self.peak = 0
+        self._lock = threading.Lock()
+
+    def route(self, content):
+        def respond(request):
+            with self._lock:
+                self.current += 1
+                self.peak = max(self.peak, self.current)
+            # Later requests are answered sooner, so they finish out of order.
+            team_id = int(request.path.split('.t.')[1].split('/')[0])
+            time.sleep(0.01 * (NUM_TEAMS - team_id))
+            with self._lock:
+                self.current -= 1
+            return 200, {'Content-Type': 'application/json'}, json.dumps(
+                {'fantasy_content': content(request.path.split('?')[0])})
+        return respond
+
+
+def team_key(i):
+    return '371.l.1234.t.{0}'.format(i)
+
+
+def roster(path):
+    return {'team': [[{'team_key': path.split('/')[2]}],
+                     {'roster': {'coverage_type': 'week', 'week': '1',
+                                 'team_key': path.split('/')[2],
+                                 '0': {'players': {'count': 0}}}}]}
+
+
+def test_api_reqs(stub, authfile):
+    in_flight = InFlight()
+    stub.routes['/team/'] = in_flight.route(lambda path: {'path': path})
+
+    with AsyncYahooFantasySports(authfile, max_concurrency=MAX_CONCURRENCY,
+                                 base_url=stub.url) as handler:
+        querystrings = ['team/{0}/metadata'.format(team_key(i)) for i in range(NUM_TEAMS)]
+        results = handler.api_reqs(querystrings)
+
+    assert [r['path'] for r in results] == ['/' + q for q in querystrings]
+    assert 1 < in_flight.peak <= MAX_CONCURRENCY
+
+
+def test_get_rosters(stub, authfile):
+    in_flight = InFlight()
+    stub.routes['/team/'] = in_flight.route(roster)
+
+    with AsyncYahooFantasySports(authfile, max_concurrency=MAX_CONCURRENCY,
+                                 base_url=stub.url) as handler:
+        teams = [YahooTeamResource({'team_key': team_key(i), 'managers': []}, handler)
+                 for i in range(NUM_TEAMS)]
+        rosters = handler.get_rosters(teams, week='1')
+
+    assert [r.team_key for r in rosters] == [t.team_key for t in teams]
+    assert len(stub.requests('/team/')) == NUM_TEAMS
+    assert 1 < in_flight.peak <= MAX_CONCURRENCY
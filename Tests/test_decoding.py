@@ -0,0 +1,57 @@
+import json
+from io import BytesIO
+
+import pytest
+
+from YHandler import decoding
+
+
+DOCUMENT = json.dumps({'fantasy_content': {'league': [
+    {'league_key': '390.l.1'},
+    {'players': {
+        'count': 2,
+        '0': {'player': [[{'player_key': '390.p.1'}], {'value': 1.5}]},
+        '1': {'player': [[{'player_key': '390.p.2'}], {'value': 2}]},
+    }},
+    {'teams': [{'team_key': '390.l.1.t.1', 'points': 10.25}, 3]},
+]}})
+
+PLAYERS = [
+    {'player': [[{'player_key': '390.p.1'}], {'value': 1.5}]},
+    {'player': [[{'player_key': '390.p.2'}], {'value': 2}]},
+]
+
+TEAMS = [{'team_key': '390.l.1.t.1', 'points': 10.25}, 3]
+
+
+@pytest.fixture(params=['ijson', 'loads'])
+def iter_collection(request, monkeypatch):
+    """iter_collection, parsing incrementally with ijson or decoding the whole document."""
+    if request.param == 'ijson':
+        pytest.importorskip('ijson')
+        assert decoding.ijson is not None
+    else:
+        monkeypatch.setattr(decoding, 'ijson', None)
+    return lambda path: list(decoding.iter_collection(BytesIO(DOCUMENT.encode('utf-8')), path))
+
+
+def test_count_wrapped_collection(iter_collection):
+    assert iter_collection('fantasy_content.league.item.players') == PLAYERS
+
+
+def test_plain_list(iter_collection):
+    assert iter_collection('fantasy_content.league.item.teams') == TEAMS
+
+
+def test_numbers_match_loads(iter_collection):
+    players = iter_collection('fantasy_content.league.item.players')
+    teams = iter_collection('fantasy_content.league.item.teams')
+
+    values = [players[0]['player'][1]['value'], players[1]['player'][1]['value'],
+              teams[0]['points'], teams[1]]
+    assert values == [1.5, 2, 10.25, 3]
+    assert [type(v) for v in values] == [float, int, float, int]
+
+
+def test_missing_collection(iter_collection):
+    assert iter_collection('fantasy_content.league.item.transactions') == []
@@ -0,0 +1,58 @@
+from YHandler import YahooFantasySports
+from YHandler.resources import YahooGameResource
+
+GAME = {'game_key': '371', 'code': 'nhl', 'name': 'Hockey', 'season': '2016'}
+
+METADATA = {'game': [
+    GAME,
+    {'game_weeks': {'count': 2,
+                    '0': {'game_week': {'week': 1, 'start': '2016-10-12', 'end': '2016-10-16'}},
+                    '1': {'game_week': {'week': 2, 'start': '2016-10-17', 'end': '2016-10-23'}}}},
+    {'stat_categories': {'stats': [
+        {'stat': {'stat_id': 1, 'name': 'Goals', 'sort_order': '1',
+                  'position_types': [{'position_type': 'P'}]}},
+        {'stat': {'stat_id': 23, 'name': 'Goals Against Average', 'sort_order': '0',
+                  'position_types': [{'position_type': 'G'}]}}]}},
+    {'position_types': [{'position_type': {'type': 'P', 'display_name': 'Players'}},
+                        {'position_type': {'type': 'G', 'display_name': 'Goaltenders'}}]},
+    {'roster_positions': [{'roster_position': {'position': 'C', 'position_type': 'P'}},
+                          {'roster_position': {'position': 'BN', 'is_bench': 1}}]},
+]}
+
+METADATA_QUERY = '/game/371;out=game_weeks,stat_categories,position_types,roster_positions'
+
+
+def test_metadata_is_loaded_once_on_first_access(stub, authfile):
+    stub.routes['/game/371;out='] = stub.fantasy_content(METADATA)
+    handler = YahooFantasySports(authfile, base_url=stub.url)
+
+    game = YahooGameResource(dict(GAME), handler)
+    assert game.name == 'Hockey'
+    assert stub.log == []
+
+    assert list(game.stat_categories) == [1, 23]
+    assert stub.requests() == [METADATA_QUERY + '?format=json']
+
+    # Everything else came with the first request.
+    assert [w.week for w in game.game_weeks] == [1, 2]
+    assert game.stat_categories[1].sort_order is True
+    assert game.stat_categories[23].sort_order is False
+    assert game.position_types['G'].display_name == 'Goaltenders'
+    assert game.roster_positions['BN'].is_bench
+    assert len(stub.requests()) == 1
+
+
+def test_get_game_doesnt_load_metadata(stub, authfile):
+    stub.routes['/game/371'] = stub.fantasy_content({'game': [GAME]})
+    stub.routes['/game/371;out='] = stub.fantasy_content(METADATA)
+    handler = YahooFantasySports(authfile, base_url=stub.url)
+
+    game = handler.get_game('371')
+    assert stub.requests() == ['/game/371?format=json']
+
+    game.roster_positions
+    # The same game again is the same object, with its metadata kept.
+    assert handler.get_game('371') is game
+    game.game_weeks
+    assert stub.requests() == ['/game/371?format=json', METADATA_QUERY + '?format=json',
+                               '/game/371?format=json']
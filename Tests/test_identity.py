@@ -0,0 +1,81 @@
+import pytest
+
+from YHandler import YahooFantasySports
+from YHandler.resources import YahooLeagueResource, YahooPlayerResource, YahooRosterResource
+
+PLAYER_KEY = '371.p.1'
+
+
+def player_api(selected_position=None, week=None):
+    """A player as returned by the API, on a roster or with weekly stats."""
+    player = [[{'player_key': PLAYER_KEY}, {'name': {'full': 'Player 1'}},
+               {'eligible_positions': [{'position': 'C'}, {'position': 'LW'}]}]]
+    if selected_position:
+        player.append({'selected_position': [
+            {'coverage_type': 'week'}, {'week': week}, {'position': selected_position}]})
+    else:
+        player.append({'player_stats': {
+            '0': {'coverage_type': 'week', 'week': week},
+            'stats': [{'stat': {'stat_id': '1', 'value': week}}]}})
+    return player
+
+
+def roster_api(week, selected_position):
+    return {'coverage_type': 'week', 'week': week,
+            '0': {'players': {'0': {'player': player_api(selected_position, week)},
+                              'count': 1}}}
+
+
+def test_rosters_share_players(authfile):
+    handler = YahooFantasySports(authfile)
+    first = YahooRosterResource(roster_api('1', 'C'), handler)
+    second = YahooRosterResource(roster_api('2', 'BN'), handler)
+
+    assert first.players[0] is second.players[0]
+    assert first.selected_positions[PLAYER_KEY]['position'] == 'C'
+    assert second.selected_positions[PLAYER_KEY]['position'] == 'BN'
+
+
+def test_stats_of_each_week_are_kept(authfile):
+    handler = YahooFantasySports(authfile)
+    first = YahooPlayerResource(player_api(week='1'), handler)._canonical()
+    second = YahooPlayerResource(player_api(week='2'), handler)._canonical()
+
+    assert first is second
+    assert first.player_stats['week'] == '2'
+    assert first.coverage_stats[('week', '1')]['stats'][0]['value'] == '1'
+    assert first.coverage_stats[('week', '2')]['stats'][0]['value'] == '2'
+
+
+def owned_player_api(owner_team_key):
+    player = player_api(week='1')
+    player.append({'ownership': {'ownership_type': 'team', 'owner_team_key': owner_team_key}})
+    return player
+
+
+def test_leagues_dont_share_players(authfile):
+    handler = YahooFantasySports(authfile)
+    first_league = YahooLeagueResource({'league_key': '371.l.1'}, handler)
+    second_league = YahooLeagueResource({'league_key': '371.l.2'}, handler)
+
+    first = YahooPlayerResource(owned_player_api('371.l.1.t.3'), first_league)._canonical()
+    second = YahooPlayerResource(owned_player_api('371.l.2.t.7'), second_league)._canonical()
+
+    assert first is not second
+    assert first.ownership['owner_team_key'] == '371.l.1.t.3'
+    assert first._context.league_key == '371.l.1'
+    assert second.ownership['owner_team_key'] == '371.l.2.t.7'
+
+    # Within a league, the player is still shared.
+    again = YahooPlayerResource(owned_player_api('371.l.1.t.4'), first_league)._canonical()
+    assert again is first
+    assert first.ownership['owner_team_key'] == '371.l.1.t.4'
+
+
+def test_selected_position_moved_to_roster(authfile):
+    handler = YahooFantasySports(authfile)
+    roster = YahooRosterResource(roster_api('1', 'C'), handler)
+
+    with pytest.raises(AttributeError) as excinfo:
+        roster.players[0].selected_position
+    assert 'selected_positions' in str(excinfo.value)
@@ -0,0 +1,250 @@
+from multiprocessing import pool as multiprocessing_pool
+import re
+import time
+
+import pytest
+
+from YHandler import YahooFantasySports
+from YHandler.resources import YahooLeagueResource, league as league_module
+from YHandler.resources.league import MAX_PLAYER_KEYS, PLAYERS_PAGE_SIZE, _players_query
+
+LEAGUE_KEY = '371.l.1'
+
+
+def player_api(player_key, week=None):
+    player = [[{'player_key': player_key}, {'name': {'full': 'Player ' + player_key}},
+               {'eligible_positions': [{'position': 'C'}]}]]
+    if week:
+        player.append({'player_stats': {
+            '0': {'coverage_type': 'week', 'week': week},
+            'stats': [{'stat': {'stat_id': '1', 'value': '2'}}]}})
+    return player
+
+
+def wrap(items):
+    """Wrap a list the way the API does, as a count and an object per index."""
+    result = dict((str(i), item) for i, item in enumerate(items))
+    result['count'] = len(items)
+    return result
+
+
+def players_by_key(stub):
+    """A route answering a players;player_keys=... query with those players, in order."""
+    def respond(request):
+        path = request.path.split('?')[0]
+        keys = re.search(r'player_keys=([^;/]+)', path).group(1).split(',')
+        week = re.search(r'week=(\w+)', path)
+        players = wrap([{'player': player_api(k, week and week.group(1))} for k in keys])
+        if path.startswith('/league/'):
+            content = {'league': [{'league_key': LEAGUE_KEY}, {'players': players}]}
+        else:
+            content = {'players': players}
+        return stub.fantasy_content(content)(request)
+    return respond
+
+
+@pytest.fixture
+def handler(stub, authfile):
+    with YahooFantasySports(authfile, base_url=stub.url) as handler:
+        yield handler
+
+
+@pytest.fixture
+def league(handler):
+    return YahooLeagueResource({'league_key': LEAGUE_KEY}, handler)
+
+
+def test_players_query():
+    assert _players_query(['371.p.1', '371.p.2']) == 'players;player_keys=371.p.1,371.p.2'
+    assert (_players_query(['371.p.1'], out=('stats', 'percent_owned')) ==
+            'players;player_keys=371.p.1;out=stats,percent_owned')
+    # Weekly stats need parameters, so are a sub-resource instead.
+    assert (_players_query(['371.p.1'], out=('stats', 'percent_owned'), week=3) ==
+            'players;player_keys=371.p.1;out=percent_owned/stats;type=week;week=3')
+    assert (_players_query(['371.p.1'], out=('stats',), week=3) ==
+            'players;player_keys=371.p.1/stats;type=week;week=3')
+    assert (_players_query(['371.p.1'], out=('ownership',), week=3) ==
+            'players;player_keys=371.p.1;out=ownership')
+
+
+def test_players_by_key_are_chunked(stub, league):
+    stub.routes['/league/'] = players_by_key(stub)
+    # Not in key order, which must be kept.
+    keys = ['371.p.{0}'.format(i) for i in reversed(range(2 * MAX_PLAYER_KEYS + 1))]
+
+    players = league.get_players_by_key(keys)
+
+    assert [p.player_key for p in players] == keys
+    requests = stub.requests('/league/')
+    assert [len(re.search(r'player_keys=([^;/]+)', r).group(1).split(','))
+            for r in requests] == [MAX_PLAYER_KEYS, MAX_PLAYER_KEYS, 1]
+    assert all(';out=stats,ownership,percent_owned?' in r for r in requests)
+
+
+def test_players_by_key_weekly_stats(stub, league):
+    stub.routes['/league/'] = players_by_key(stub)
+
+    players = league.get_players_by_key(['371.p.2', '371.p.1'], week=3)
+
+    assert stub.requests('/league/') == [
+        '/league/371.l.1/players;player_keys=371.p.2,371.p.1;out=ownership,percent_owned'
+        '/stats;type=week;week=3?format=json']
+    assert [p.player_key for p in players] == ['371.p.2', '371.p.1']
+    assert all(p.player_stats['week'] == '3' for p in players)
+
+
+def test_handler_get_players(stub, handler):
+    stub.routes['/players;'] = players_by_key(stub)
+    keys = ['371.p.{0}'.format(i) for i in range(MAX_PLAYER_KEYS + 1)]
+
+    players = handler.get_players(keys, out=('percent_owned',))
+
+    assert [p.player_key for p in players] == keys
+    assert stub.requests('/players;') == [
+        '/players;player_keys={0};out=percent_owned?format=json'.format(','.join(keys[:-1])),
+        '/players;player_keys={0};out=percent_owned?format=json'.format(keys[-1])]
+
+
+def test_no_players_no_requests(stub, league):
+    assert league.get_players_by_key([]) == []
+    assert stub.log == []
+
+
+def player_pages(stub, total):
+    """A route answering players;start=N pages of a pool of total players."""
+    def respond(request):
+        start = int(re.search(r'start=(\d+)', request.path).group(1))
+        keys = ['371.p.{0}'.format(i) for i in range(start, min(total, start + PLAYERS_PAGE_SIZE))]
+        # Past the last page the API returns an empty list.
+        players = wrap([{'player': player_api(k)} for k in keys]) if keys else []
+        return stub.fantasy_content(
+            {'league': [{'league_key': LEAGUE_KEY}, {'players': players}]})(request)
+    return respond
+
+
+def page_starts(stub):
+    return [int(re.search(r'start=(\d+)', r).group(1)) for r in stub.requests('/league/')]
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_iter_players_until_short_page(stub, league, prefetch):
+    stub.routes['/league/'] = player_pages(stub, 2 * PLAYERS_PAGE_SIZE + 10)
+
+    players = list(league.iter_players(status='A', sort='OR', prefetch=prefetch))
+
+    assert [p.player_key for p in players] == [
+        '371.p.{0}'.format(i) for i in range(2 * PLAYERS_PAGE_SIZE + 10)]
+    assert page_starts(stub) == [0, PLAYERS_PAGE_SIZE, 2 * PLAYERS_PAGE_SIZE]
+    assert all(';count={0};status=A;sort=OR?'.format(PLAYERS_PAGE_SIZE) in r
+               for r in stub.requests('/league/'))
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_iter_players_until_empty_page(stub, league, prefetch):
+    stub.routes['/league/'] = player_pages(stub, 2 * PLAYERS_PAGE_SIZE)
+
+    players = list(league.iter_players(prefetch=prefetch))
+
+    assert len(players) == 2 * PLAYERS_PAGE_SIZE
+    assert page_starts(stub) == [0, PLAYERS_PAGE_SIZE, 2 * PLAYERS_PAGE_SIZE]
+
+
+def test_iter_players_prefetches_next_page(stub, league):
+    stub.routes['/league/'] = player_pages(stub, 3 * PLAYERS_PAGE_SIZE)
+
+    players = league.iter_players(prefetch=True)
+    next(players)
+
+    # The second page is requested while the first is being consumed.
+    deadline = time.time() + 5
+    while len(stub.requests('/league/')) < 2 and time.time() < deadline:
+        time.sleep(0.01)
+    assert page_starts(stub) == [0, PLAYERS_PAGE_SIZE]
+    players.close()
+
+
+@pytest.mark.parametrize('prefetch', [False, True])
+def test_closing_iter_players_early(stub, league, monkeypatch, prefetch):
+    pools = []
+
+    def thread_pool(processes):
+        pools.append(multiprocessing_pool.ThreadPool(processes))
+        return pools[-1]
+    monkeypatch.setattr(league_module, 'ThreadPool', thread_pool)
+    stub.routes['/league/'] = player_pages(stub, 3 * PLAYERS_PAGE_SIZE)
+
+    players = league.iter_players(prefetch=prefetch)
+    next(players)
+    players.close()
+
+    # The third page is never requested.
+    assert len(stub.requests('/league/')) <= 2
+    if prefetch:
+        pool, = pools
+        assert pool._state == multiprocessing_pool.TERMINATE
+    else:
+        assert pools == []
+
+
+def team_api(i):
+    return [{'team_key': '{0}.t.{1}'.format(LEAGUE_KEY, i)}, {'team_id': str(i)},
+            {'name': 'Team {0}'.format(i)},
+            {'managers': [{'manager': {'nickname': 'Manager {0}'.format(i)}}]}]
+
+
+SNAPSHOT = {'league': [
+    {'league_key': LEAGUE_KEY, 'name': 'League'},
+    {'settings': [{
+        'roster_positions': [{'roster_position': {'position': 'C', 'count': '2'}},
+                             {'roster_position': {'position': 'BN', 'count': 4}}],
+        'stat_categories': {'stats': [
+            {'stat': {'stat_id': 1, 'name': 'Goals', 'sort_order': '1',
+                      'stat_position_types': [{'stat_position_type': {'position_type': 'P'}}]}}]},
+        'stat_modifiers': {'stats': [{'stat': {'stat_id': '1', 'value': '3'}}]},
+    }]},
+    {'standings': [{'teams': wrap([
+        {'team': [team_api(2), {'team_points': {'total': '90'}},
+                  {'team_standings': {'rank': 1}}]},
+        {'team': [team_api(1), {'team_points': {'total': '80'}},
+                  {'team_standings': {'rank': 2}}]},
+    ])}]},
+    {'scoreboard': {'week': '3', 'matchups': wrap([
+        {'matchup': {'week': '3', 'status': 'midevent'}}])}},
+]}
+
+ROSTERS = {'league': [
+    {'league_key': LEAGUE_KEY},
+    {'teams': wrap([
+        {'team': [team_api(i), {'roster': {
+            'coverage_type': 'date', 'date': '2016-10-12',
+            '0': {'players': wrap([{'player': player_api('371.p.{0}'.format(i))}])}}}]}
+        for i in (1, 2)])},
+]}
+
+
+def test_snapshot(stub, league):
+    stub.routes['/league/371.l.1;out='] = stub.fantasy_content(SNAPSHOT)
+    stub.routes['/league/371.l.1/teams/roster'] = stub.fantasy_content(ROSTERS)
+
+    snapshot = league.snapshot()
+
+    assert stub.requests() == [
+        '/league/371.l.1;out=settings,standings,scoreboard?format=json',
+        '/league/371.l.1/teams/roster?format=json']
+    assert snapshot.league is league
+
+    # The settings are applied to the league.
+    assert [p.count for p in league.roster_positions] == [2, 4]
+    assert [c.stat_position_types for c in league.stat_categories] == [['P']]
+    assert league.stat_modifiers == {1: 3.0}
+
+    assert [t.team_key for t in snapshot.standings] == ['371.l.1.t.2', '371.l.1.t.1']
+    assert snapshot.standings[0].team_standings == {'rank': 1}
+    assert snapshot.scoreboard == [{'matchup': {'week': '3', 'status': 'midevent'}}]
+
+    first, second = snapshot.teams
+    assert first.roster.players[0].player_key == '371.p.1'
+    # Teams are shared by the standings and the rosters.
+    assert snapshot.get_team('371.l.1.t.2') is second is snapshot.standings[0]
+    assert second.team_points == {'total': '90'}
+    assert snapshot.get_team('371.l.1.t.9') is None
@@ -0,0 +1,210 @@
+from io import BytesIO
+import threading
+import time
+
+import pytest
+import requests
+
+from YHandler import YahooFantasySports
+from YHandler.base import GET_TOKEN_URL, YahooApiException
+from YHandler.cache import ResponseCache
+from YHandler.metrics import MetricsCollector, RequestEvent, _percentile, query_pattern
+from YHandler.ratelimit import RateLimiter
+
+
+def make_response(status_code, content, headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    response.raw = BytesIO(content)
+    response.headers.update(headers or {})
+    return response
+
+
+OK = b'{"fantasy_content": {"ok": true}}'
+
+
+class ScriptedTransport(object):
+    """Answers each request with the next of ``responses``, then with ``OK``."""
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        if self.responses:
+            return self.responses.pop(0)
+        return make_response(200, OK)
+
+    def close(self):
+        pass
+
+
+def make_handler(authfile, transport, **kwargs):
+    metrics = MetricsCollector()
+    handler = YahooFantasySports(authfile, transport=transport,
+                                 rate_limiter=RateLimiter(rate=1000), **kwargs)
+    handler.add_hook(metrics)
+    return handler, metrics
+
+
+def make_event(querystring, **timings):
+    event = RequestEvent(querystring, 'GET')
+    event.timings.update(timings)
+    return event
+
+
+def test_query_pattern():
+    assert query_pattern('league/371.l.1234/players;start=25') == 'league/{}/players;start={}'
+    assert query_pattern('team/371.l.1234.t.1/roster;week=3') == 'team/{}/roster;week={}'
+    assert (query_pattern('league/371.l.1234/players;player_keys=371.p.1,371.p.2/stats') ==
+            'league/{}/players;player_keys={}/stats')
+    assert query_pattern('game/nfl;out=stat_categories') == 'game/{};out={}'
+    assert query_pattern('users;use_login=1/games') == 'users;use_login={}/games'
+
+
+def test_percentile_interpolates():
+    values = [1.0, 2.0, 3.0, 4.0]
+    assert _percentile(values, 0) == 1.0
+    assert _percentile(values, 100) == 4.0
+    assert _percentile(values, 50) == pytest.approx(2.5)
+    # Position 2.7, between the third and fourth values.
+    assert _percentile(values, 90) == pytest.approx(3.7)
+    assert _percentile([5.0], 99) == 5.0
+    assert _percentile([], 50) is None
+
+
+def test_collector_percentile_and_summary():
+    metrics = MetricsCollector()
+    for seconds in (0.1, 0.2, 0.3):
+        metrics(make_event('league/371.l.1/players;start=0', network=seconds))
+    failed = make_event('game/nfl', network=1.0)
+    failed.error = YahooApiException('404: not found')
+    metrics(failed)
+
+    players = 'league/{}/players;start={}'
+    assert metrics.count() == 4
+    assert metrics.count(players) == 3
+    assert metrics.percentile('network', 50, players) == pytest.approx(0.2)
+    assert metrics.percentile('network', 100) == pytest.approx(1.0)
+    assert metrics.percentile('decode', 50) is None
+
+    summary = metrics.summary(percentiles=(50,))
+    assert summary[players]['count'] == 3
+    assert summary[players]['errors'] == 0
+    assert summary[players]['network'] == {50: pytest.approx(0.2)}
+    assert summary['game/{}']['errors'] == 1
+
+
+def test_collector_maxlen():
+    metrics = MetricsCollector(maxlen=2)
+    for week in range(3):
+        metrics(make_event('team/371.l.1.t.1/roster;week={0}'.format(week)))
+    assert [e.querystring for e in metrics.events] == [
+        'team/371.l.1.t.1/roster;week=1', 'team/371.l.1.t.1/roster;week=2']
+
+
+def test_request_event(authfile):
+    handler, metrics = make_handler(authfile, ScriptedTransport())
+
+    assert handler.api_req('league/371.l.1/teams') == {'ok': True}
+
+    event, = metrics.events
+    assert event.pattern == 'league/{}/teams'
+    assert event.status == 200
+    assert event.bytes == len(OK)
+    assert event.error is None
+    assert (event.retries, event.refreshed, event.cache_hit, event.coalesced) == (0, False, False, False)
+    # The fake transport doesn't call the signer, so there's no 'sign' stage.
+    assert set(event.timings) == set(['wait', 'network', 'decode', 'total'])
+
+
+def test_cache_hit_event(authfile):
+    transport = ScriptedTransport()
+    handler, metrics = make_handler(authfile, transport,
+                                    cache=ResponseCache(rules=[(r'^game/', 60)]))
+
+    handler.api_req('game/nfl')
+    handler.api_req('game/nfl')
+
+    assert len(transport.requests) == 1
+    miss, hit = metrics.events
+    assert not miss.cache_hit and miss.status == 200
+    assert hit.cache_hit
+    assert hit.status is None
+    assert 'network' not in hit.timings and 'cache' in hit.timings
+
+
+def test_retries_event(authfile):
+    throttled = make_response(999, b'{}', {'Retry-After': '0'})
+    handler, metrics = make_handler(authfile, ScriptedTransport(throttled, throttled))
+
+    handler.api_req('game/nfl')
+
+    event, = metrics.events
+    assert event.retries == 2
+    assert event.status == 200
+
+
+def test_refreshed_event(authfile):
+    transport = ScriptedTransport(
+        make_response(401, b'{"error": {"description": "token_expired"}}'),
+        make_response(200, b'oauth_token=new&oauth_token_secret=secret&oauth_session_handle=handle'))
+    handler, metrics = make_handler(authfile, transport)
+
+    handler.api_req('game/nfl')
+
+    assert [url for _, url in transport.requests].count(GET_TOKEN_URL) == 1
+    event, = metrics.events
+    assert event.refreshed
+    assert event.status == 200
+    assert 'refresh' in event.timings
+
+
+def test_failed_request_event(authfile):
+    # Rejected before and after refreshing the token.
+    handler, metrics = make_handler(authfile, ScriptedTransport(
+        make_response(400, b'{"error": {"description": "invalid key"}}'),
+        make_response(200, b'oauth_token=new&oauth_token_secret=secret&oauth_session_handle=handle'),
+        make_response(400, b'{"error": {"description": "invalid key"}}')))
+
+    with pytest.raises(YahooApiException) as excinfo:
+        handler.api_req('game/nope')
+
+    event, = metrics.events
+    assert event.error is excinfo.value
+    assert event.status == 400
+    assert event.refreshed
+    assert 'total' in event.timings
+    assert metrics.summary()['game/{}']['errors'] == 1
+
+
+def test_coalesced_event(authfile):
+    handler = None
+
+    class SlowTransport(ScriptedTransport):
+        def request(self, method, url, **kwargs):
+            # Answer once the second request is waiting for this one.
+            deadline = time.time() + 5
+            while time.time() < deadline:
+                with handler._inflight_lock:
+                    if any(f.followers for f in handler._inflight.values()):
+                        break
+                time.sleep(0.01)
+            return super(SlowTransport, self).request(method, url, **kwargs)
+
+    transport = SlowTransport()
+    handler, metrics = make_handler(authfile, transport)
+
+    threads = [threading.Thread(target=handler.api_req, args=('game/nfl',)) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(transport.requests) == 1
+    leader, follower = sorted(metrics.events, key=lambda e: e.coalesced)
+    assert not leader.coalesced and leader.status == 200
+    assert follower.coalesced
+    assert follower.status is None
+    assert 'coalesce' in follower.timings and 'network' not in follower.timings
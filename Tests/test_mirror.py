@@ -0,0 +1,84 @@
+from YHandler.mirror import LeagueMirror
+from YHandler.resources import YahooTransactionPoller
+
+LEAGUE_KEY = '371.l.1234'
+
+# The players on each team.
+ROSTERS = {
+    '371.l.1234.t.1': ['371.p.1', '371.p.2'],
+    '371.l.1234.t.2': ['371.p.3'],
+}
+
+
+class Record(object):
+    def __init__(self, **kwargs):
+        self.__dict__.update(kwargs)
+
+
+def transaction(key, timestamp, team_key):
+    return Record(transaction_key=key, timestamp=timestamp, team_keys=set([team_key]))
+
+
+class FakeLeague(object):
+    """A league with the given rosters, whose transactions are added newest first."""
+    def __init__(self):
+        self.league_key = LEAGUE_KEY
+        self._api_dict = {'league_key': LEAGUE_KEY, 'current_week': '3'}
+        self.transactions = []
+        self.stats_requested = []
+
+    def _get_game(self):
+        return Record(game_weeks=[])
+
+    def poll_transactions(self, types=None, page_size=10, cursor=None):
+        return YahooTransactionPoller(self, types, page_size, cursor)
+
+    def get_transactions(self, types=None, start=None, count=None):
+        start = start or 0
+        return self.transactions[start:start + count]
+
+    def get_rosters(self, team_keys=None):
+        return [Record(team_key=team_key, _api_dict={'name': team_key},
+                       roster=Record(players=[Record(player_key=p) for p in ROSTERS[team_key]],
+                                     selected_positions={}))
+                for team_key in team_keys or sorted(ROSTERS)]
+
+    def get_players_by_key(self, player_keys, out=()):
+        self.stats_requested.extend(player_keys)
+        return [Record(player_key=p, _api_dict={
+            'name': {'full': p},
+            'coverage_stats': {('week', '3'): {'stats': [{'stat_id': '1', 'value': '2'}]}}})
+            for p in player_keys]
+
+
+def test_sync_resumes_within_a_second(tmpdir):
+    path = str(tmpdir.join('mirror.db'))
+    league = FakeLeague()
+    league.transactions.insert(0, transaction('t.1', 100, '371.l.1234.t.1'))
+
+    mirror = LeagueMirror(league, path)
+    assert mirror.sync()['full']
+    mirror.close()
+
+    # A transaction in the same second as the last one seen, picked up by a
+    # new mirror of the same database.
+    league.transactions.insert(0, transaction('t.2', 100, '371.l.1234.t.2'))
+    mirror = LeagueMirror(league, path)
+    result = mirror.sync()
+    assert not result['full']
+    assert result['teams'] == ['371.l.1234.t.2']
+
+    assert mirror.sync()['teams'] == []
+
+
+def test_sync_refreshes_stats_of_changed_rosters(tmpdir):
+    league = FakeLeague()
+    mirror = LeagueMirror(league, str(tmpdir.join('mirror.db')))
+    mirror.sync()
+    assert mirror.player_stats('371.p.1', 'week', 3) == {1: 2.0}
+
+    # Known players on a roster which changed have their stats refreshed.
+    league.stats_requested = []
+    league.transactions.insert(0, transaction('t.1', 100, '371.l.1234.t.1'))
+    assert mirror.sync()['players'] == ['371.p.1', '371.p.2']
+    assert league.stats_requested == ['371.p.1', '371.p.2']
@@ -0,0 +1,51 @@
+import pytest
+from oauthlib.oauth1 import Client
+from oauthlib.oauth1.rfc5849.utils import parse_authorization_header
+
+from YHandler import OAuth1Lite
+from YHandler.OAuth1Lite import OAuth1Signer
+
+CREDENTIALS = ('consumer-key', 'consumer-secret', 'access-token', 'access-token-secret')
+NONCE = u'1234567890abcdef'
+TIMESTAMP = u'1500000000'
+
+
+@pytest.fixture
+def fixed(monkeypatch):
+    monkeypatch.setattr(OAuth1Lite, 'generate_nonce', lambda: NONCE)
+    monkeypatch.setattr(OAuth1Lite, 'generate_timestamp', lambda: TIMESTAMP)
+
+
+def oauthlib_header(url, method):
+    client = Client(CREDENTIALS[0], client_secret=CREDENTIALS[1],
+                    resource_owner_key=CREDENTIALS[2], resource_owner_secret=CREDENTIALS[3],
+                    nonce=NONCE, timestamp=TIMESTAMP)
+    _, headers, _ = client.sign(url, method)
+    return headers['Authorization']
+
+
+@pytest.mark.parametrize('url, method', [
+    (u'https://fantasysports.yahooapis.com/fantasy/v2/game/nfl?format=json', u'GET'),
+    (u'https://fantasysports.yahooapis.com/fantasy/v2/league/371.l.1234/players;'
+     u'start=25;count=25?format=json', u'GET'),
+    (u'https://fantasysports.yahooapis.com/fantasy/v2/league/371.l.1234/players;'
+     u'player_keys=371.p.1,371.p.2;out=stats?format=json&search=a%20b', u'GET'),
+    (u'https://fantasysports.yahooapis.com/fantasy/v2/league/371.l.1234/transactions'
+     u'?format=json', u'POST'),
+])
+def test_signature_matches_oauthlib(fixed, url, method):
+    header = OAuth1Signer(*CREDENTIALS).sign(url, method)
+    assert u'oauth_signature=' in header
+
+    assert dict(parse_authorization_header(header)) == dict(
+        parse_authorization_header(oauthlib_header(url, method)))
+
+
+def test_signer_without_token(fixed):
+    url = u'https://fantasysports.yahooapis.com/fantasy/v2/game/nfl?format=json'
+    header = dict(parse_authorization_header(OAuth1Signer(*CREDENTIALS[:2]).sign(url, u'GET')))
+
+    client = Client(CREDENTIALS[0], client_secret=CREDENTIALS[1], nonce=NONCE, timestamp=TIMESTAMP)
+    _, headers, _ = client.sign(url, u'GET')
+    assert header == dict(parse_authorization_header(headers['Authorization']))
+    assert u'oauth_token' not in header
@@ -0,0 +1,145 @@
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+import pytest
+
+from YHandler import YahooFantasySports
+from YHandler.resources import (CompactPlayer, CompactTeam, YahooLeagueResource,
+                                YahooRosterResource, YahooTeamResource, set_default_handler)
+
+PROTOCOLS = range(pickle.HIGHEST_PROTOCOL + 1)
+
+
+def player_api(i):
+    return [[{'player_key': '371.p.{0}'.format(i)}, {'player_id': str(i)},
+             {'name': {'full': 'Player {0}'.format(i)}},
+             {'eligible_positions': [{'position': 'C'}, {'position': 'LW'}]}],
+            {'selected_position': [{'coverage_type': 'week'}, {'week': '1'}, {'position': 'C'}]},
+            {'player_stats': {'0': {'coverage_type': 'week', 'week': '1'},
+                              'stats': [{'stat': {'stat_id': '1', 'value': str(i)}},
+                                        {'stat': {'stat_id': '2', 'value': '-'}}]}}]
+
+
+def make_team(handler):
+    league = YahooLeagueResource({'league_key': '371.l.1'}, handler)
+    team = YahooTeamResource({'team_key': '371.l.1.t.1', 'name': 'Team 1',
+                              'managers': [{'manager': {'nickname': 'Manager'}}]}, league)
+    team._api_dict['roster'] = YahooRosterResource(
+        {'coverage_type': 'week', 'week': '1',
+         '0': {'players': {'count': 2, '0': {'player': player_api(1)},
+                           '1': {'player': player_api(2)}}}}, team)
+    return team
+
+
+@pytest.fixture
+def default_handler():
+    """set_default_handler, reset once the test is done."""
+    yield set_default_handler
+    set_default_handler(None)
+
+
+@pytest.mark.parametrize('protocol', PROTOCOLS)
+def test_resources_round_trip(authfile, default_handler, protocol):
+    team = make_team(YahooFantasySports(authfile))
+    data = pickle.dumps(team, protocol)
+    assert b'oauth_access_token' not in data
+
+    # Unpickled resources are unbound, until a default handler is set.
+    unbound = pickle.loads(data)
+    with pytest.raises(RuntimeError):
+        unbound._api
+
+    worker = YahooFantasySports(authfile)
+    default_handler(worker)
+    copy = pickle.loads(data)
+
+    players = copy.roster.players
+    assert [p.player_key for p in players] == ['371.p.1', '371.p.2']
+    assert copy.roster.selected_positions['371.p.2']['position'] == 'C'
+    assert players[0].player_stats['stats'][0]['value'] == '1'
+    assert copy.managers[0].nickname == 'Manager'
+    assert copy._api is worker
+
+    # Resources which shared a context still do, and keep its keys.
+    assert copy._context is copy.roster._context
+    assert all(p._context is copy._context for p in players)
+    assert copy._context.league_key == '371.l.1'
+    assert copy._context.game_key == '371'
+
+
+@pytest.mark.parametrize('protocol', PROTOCOLS)
+def test_compact_round_trip(authfile, protocol):
+    team = CompactTeam.from_resource(make_team(YahooFantasySports(authfile)))
+
+    copy = pickle.loads(pickle.dumps(team, protocol))
+
+    assert (copy.team_key, copy.name, copy.managers) == ('371.l.1.t.1', 'Team 1', ('Manager',))
+    assert (copy.roster.coverage_type, copy.roster.coverage) == ('week', '1')
+    first, second = copy.roster.players
+    assert isinstance(first, CompactPlayer)
+    assert first.player_key == '371.p.1'
+    assert first.eligible_positions == ('C', 'LW')
+    assert first.selected_position == 'C'
+    assert first.stat(1) == 1.0
+    assert second.stat(1) == 2.0
+    assert second.stat(2) != second.stat(2)
+    # Unpickled players share their stat IDs, as when built.
+    assert first.stat_ids is second.stat_ids is team.roster.players[0].stat_ids
+
+
+def test_compact_player_without_stats():
+    player = CompactPlayer('371.p.1', name='Player 1')
+    for protocol in PROTOCOLS:
+        copy = pickle.loads(pickle.dumps(player, protocol))
+        assert (copy.player_key, copy.name, copy.stat_ids) == ('371.p.1', 'Player 1', ())
+        assert len(copy.stat_values) == 0
+
+
+def test_rebind_reaches_nested_resources(authfile):
+    team = pickle.loads(pickle.dumps(make_team(YahooFantasySports(authfile))))
+    other = YahooFantasySports(authfile)
+
+    team.rebind(other)
+
+    resources = [team, team.roster] + list(team.roster.players) + team.managers
+    assert all(r._api is other for r in resources)
+    # Resources which shared a context still share one, with the keys kept.
+    assert all(r._context is team._context for r in resources)
+    assert team._context.league_key == '371.l.1'
+
+
+def test_rebind_keeps_separate_contexts_separate(authfile):
+    handler = YahooFantasySports(authfile)
+    team = make_team(handler)
+    league = YahooLeagueResource({'league_key': '371.l.2'}, handler)
+    # E.g. a player fetched from another league, added to the roster.
+    team.roster._api_dict['players'].append(YahooRosterResource(
+        {'coverage_type': 'week', 'week': '1',
+         '0': {'players': {'count': 1, '0': {'player': player_api(3)}}}}, league).players[0])
+    original = team._context
+    other = YahooFantasySports(authfile)
+
+    team.rebind(other)
+
+    first, second, third = team.roster.players
+    assert first._context is second._context is team._context
+    assert third._context is not team._context
+    assert third._context.league_key == '371.l.2'
+    assert third._api is other
+    # The original resources' context isn't changed.
+    assert original.handler is handler
+
+
+def test_unbound_resources_raise(authfile):
+    team = pickle.loads(pickle.dumps(make_team(YahooFantasySports(authfile))))
+    player = team.roster.players[0]
+
+    with pytest.raises(RuntimeError) as excinfo:
+        player.api_req('stats')
+    assert 'rebind()' in str(excinfo.value)
+
+    handler = YahooFantasySports(authfile)
+    team.rebind(handler)
+    assert player._api is handler
@@ -1,12 +1,58 @@
-from YHandler import YHandler
-from YHandler import YQuery
+"""
+Queries against recorded API responses.
+
+By default the responses in ``recordings/`` are replayed, without a network or
+credentials. Recordings never include the authorization headers or token
+requests. To (re-)record them against the live API, set ``YHANDLER_RECORD`` to
+the path of an authorization file, e.g.::
+
+    YHANDLER_RECORD=../auth.json python -m pytest Tests
+"""
 import json
+import os
+
+import pytest
+
+from YHandler import YahooFantasySports
+from YHandler.transport import RecordingTransport, ReplayTransport
+
+RECORDINGS = os.path.join(os.path.dirname(__file__), 'recordings')
+GAME_KEY = 'nfl'
+
+
+@pytest.fixture
+def handler(tmpdir):
+    authf = os.environ.get('YHANDLER_RECORD')
+    if authf:
+        transport = RecordingTransport(RECORDINGS)
+    else:
+        transport = ReplayTransport(RECORDINGS)
+
+        # Requests are not signed when replayed, any token will do.
+        authf = str(tmpdir.join('auth.json'))
+        with open(authf, 'w') as f:
+            json.dump({'consumer_key': 'key', 'consumer_secret': 'secret',
+                       'oauth_access_token': 'token',
+                       'oauth_access_token_secret': 'secret',
+                       'oauth_session_handle': 'handle'}, f)
+
+    with YahooFantasySports(authf, transport=transport) as handler:
+        yield handler
+
+
+def test_get_user_leagues(handler):
+    game = handler.get_game(GAME_KEY)
+    leagues = game.get_leagues()
+    for league in leagues:
+        assert league.league_key.startswith(game.game_key)
+
 
-handler = YHandler('../auth.json')
-query = YQuery(handler, 'nfl')
-leagues = query.get_user_leagues()
-# player = query.find_player(leagues[1]['id'], 'Tom Brady')
-# stats = query.get_player_season_stats(player[0]['id'])
-# f = open('stats.json', 'w')
-# json.dump(stats, f)
-# f.close()
\ No newline at end of file
+def test_find_player(handler):
+    leagues = handler.get_game(GAME_KEY).get_leagues()
+    if not leagues:
+        pytest.skip('the user has no leagues')
+    players = leagues[-1].find_player('Brady')
+    assert players
+    for player in players:
+        assert player.player_key
+        assert 'Brady' in player.name['full']
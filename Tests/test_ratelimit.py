@@ -0,0 +1,138 @@
+from email.utils import formatdate
+from io import BytesIO
+
+import pytest
+import requests
+
+from YHandler import YahooFantasySports, ratelimit
+from YHandler.base import YahooApiException
+from YHandler.ratelimit import RateLimiter, _parse_retry_after
+
+
+class FakeClock(object):
+    """Stands in for the time module, sleeping only advances the clock."""
+    def __init__(self, now=1000000000.0):
+        self.now = now
+        self.sleeps = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = FakeClock()
+    monkeypatch.setattr(ratelimit, 'time', clock)
+    return clock
+
+
+def test_rate_must_be_positive():
+    with pytest.raises(ValueError):
+        RateLimiter(rate=0)
+
+
+def test_token_bucket(clock):
+    limiter = RateLimiter(rate=2, burst=2)
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == []
+
+    # The burst is used up, so wait for the next token.
+    limiter.acquire()
+    assert sum(clock.sleeps) == pytest.approx(0.5)
+
+    # Idle time refills the bucket, up to the burst.
+    clock.now += 10
+    clock.sleeps = []
+    limiter.acquire()
+    limiter.acquire()
+    assert clock.sleeps == []
+
+
+def test_parse_retry_after(clock):
+    assert _parse_retry_after('3') == 3.0
+    assert _parse_retry_after(formatdate(clock.now + 30, usegmt=True)) == pytest.approx(30)
+    # Dates in the past mean no waiting.
+    assert _parse_retry_after(formatdate(clock.now - 30, usegmt=True)) == 0.0
+    assert _parse_retry_after('soon') is None
+    assert _parse_retry_after(None) is None
+
+
+def test_backoff_pauses_requests(clock):
+    limiter = RateLimiter(rate=100)
+    assert limiter.backoff(0, '5') == 5.0
+    limiter.acquire()
+    assert sum(clock.sleeps) == pytest.approx(5)
+
+
+class ThrottlingTransport(object):
+    """Throttles the first ``throttled`` requests."""
+    def __init__(self, throttled, status_code=999, retry_after='2'):
+        self.throttled = throttled
+        self.status_code = status_code
+        self.retry_after = retry_after
+        self.responses = []
+
+    @property
+    def sent(self):
+        return len(self.responses)
+
+    def request(self, method, url, **kwargs):
+        response = requests.Response()
+        if self.sent < self.throttled:
+            response.status_code = self.status_code
+            response.headers['Retry-After'] = self.retry_after
+            response._content = b'{"error": {"description": "throttled"}}'
+        else:
+            response.status_code = 200
+            response._content = b'{"fantasy_content": {"ok": true}}'
+        # Stands in for the connection, as when streaming.
+        response.raw = BytesIO(response._content)
+        self.responses.append(response)
+        return response
+
+    def close(self):
+        pass
+
+
+def test_backoff_is_capped(clock):
+    limiter = RateLimiter(rate=100, backoff_max=30)
+    assert limiter.backoff(0, '3600') == 30
+    assert limiter.backoff(0, formatdate(clock.now + 3600, usegmt=True)) == pytest.approx(30)
+    limiter.acquire()
+    assert sum(clock.sleeps) == pytest.approx(30)
+
+
+def test_throttled_requests_are_retried(clock, authfile):
+    transport = ThrottlingTransport(throttled=2)
+    handler = YahooFantasySports(authfile, transport=transport)
+
+    assert handler.api_req('game/nfl') == {'ok': True}
+    assert transport.sent == 3
+    assert sum(clock.sleeps) == pytest.approx(4)
+    # The throttled responses are closed, releasing their connections.
+    assert [r.raw.closed for r in transport.responses] == [True, True, False]
+
+
+def test_retry_after_is_capped(clock, authfile):
+    transport = ThrottlingTransport(throttled=1, retry_after='86400')
+    handler = YahooFantasySports(authfile, transport=transport,
+                                 rate_limiter=RateLimiter(backoff_max=5))
+
+    assert handler.api_req('game/nfl') == {'ok': True}
+    assert sum(clock.sleeps) == pytest.approx(5)
+
+
+def test_throttled_requests_give_up(clock, authfile):
+    transport = ThrottlingTransport(throttled=10, status_code=429)
+    handler = YahooFantasySports(authfile, transport=transport,
+                                 rate_limiter=RateLimiter(max_retries=2))
+
+    with pytest.raises(YahooApiException):
+        handler.api_req('game/nfl')
+    # The first attempt and two retries, without refreshing the token.
+    assert transport.sent == 3
@@ -0,0 +1,127 @@
+import threading
+import time
+
+import pytest
+import requests
+
+from YHandler import YahooFantasySports
+from YHandler.base import GET_TOKEN_URL, REFRESH_MARGIN, YahooApiException
+
+
+def make_response(status_code, content):
+    response = requests.Response()
+    response.status_code = status_code
+    response._content = content
+    return response
+
+
+class TokenRejectingTransport(object):
+    """Rejects every token refresh, answers other requests with ``status_code``."""
+    def __init__(self, status_code=200):
+        self.status_code = status_code
+        self.requests = []
+
+    def request(self, method, url, **kwargs):
+        self.requests.append((method, url))
+        if url == GET_TOKEN_URL:
+            return make_response(401, b'oauth_problem=token_rejected')
+        return make_response(self.status_code, b'{"fantasy_content": {}}')
+
+    def refreshes(self):
+        return [r for r in self.requests if r[1] == GET_TOKEN_URL]
+
+    def close(self):
+        pass
+
+
+def test_failed_proactive_refresh_is_not_repeated(authfile):
+    transport = TokenRejectingTransport()
+    handler = YahooFantasySports(authfile, transport=transport)
+    handler.authd['oauth_expires_at'] = time.time()
+
+    for _ in range(3):
+        handler.api_req('game/nfl')
+
+    assert len(transport.refreshes()) == 1
+    assert len(transport.requests) == 4
+
+
+def test_failed_refresh_after_rejection_is_not_repeated(authfile):
+    transport = TokenRejectingTransport(status_code=401)
+    handler = YahooFantasySports(authfile, transport=transport)
+
+    for _ in range(3):
+        with pytest.raises(YahooApiException):
+            handler.api_req('game/nfl')
+
+    assert len(transport.refreshes()) == 1
+    # The rejected request isn't re-sent when the token couldn't be refreshed.
+    assert len(transport.requests) == 4
+
+
+class RefreshingTransport(object):
+    """Grants a new token on each refresh, after ``delay`` seconds."""
+    def __init__(self, delay=0):
+        self.delay = delay
+        self.refreshes = 0
+        self.tokens = []
+        self._lock = threading.Lock()
+
+    def request(self, method, url, **kwargs):
+        if url == GET_TOKEN_URL:
+            time.sleep(self.delay)
+            with self._lock:
+                self.refreshes += 1
+                token = 'token{0}'.format(self.refreshes)
+            return make_response(200, 'oauth_token={0}&oauth_token_secret=secret&'
+                                 'oauth_session_handle=handle&oauth_expires_in=3600'.format(token))
+        with self._lock:
+            self.tokens.append(kwargs['auth'].oauth_token)
+        return make_response(200, b'{"fantasy_content": {}}')
+
+    def close(self):
+        pass
+
+
+def test_proactive_refresh(authfile):
+    transport = RefreshingTransport()
+    handler = YahooFantasySports(authfile, transport=transport)
+    # Not expired yet, but within the margin.
+    handler.authd['oauth_expires_at'] = time.time() + REFRESH_MARGIN / 2
+
+    handler.api_req('game/nfl')
+    handler.api_req('game/nfl')
+
+    assert transport.refreshes == 1
+    # Both requests were sent with the new token.
+    assert transport.tokens == ['token1', 'token1']
+    assert handler.authd['oauth_expires_at'] == pytest.approx(time.time() + 3600, abs=5)
+    assert handler.authc.get_authvals()['oauth_access_token'] == 'token1'
+
+
+def test_token_is_not_refreshed_early(authfile):
+    transport = RefreshingTransport()
+    handler = YahooFantasySports(authfile, transport=transport)
+    handler.authd['oauth_expires_at'] = time.time() + REFRESH_MARGIN * 2
+
+    handler.api_req('game/nfl')
+
+    assert transport.refreshes == 0
+    assert transport.tokens == ['token']
+
+
+def test_concurrent_requests_refresh_once(authfile):
+    # Slow enough for every thread to find the token expired.
+    transport = RefreshingTransport(delay=0.2)
+    handler = YahooFantasySports(authfile, transport=transport)
+    handler.authd['oauth_expires_at'] = time.time() - 1
+
+    threads = [threading.Thread(target=handler.api_req, args=('game/{0}'.format(i),))
+               for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert transport.refreshes == 1
+    assert transport.tokens == ['token1'] * 8
@@ -0,0 +1,78 @@
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from YHandler.resources import YahooLeagueResource
+from YHandler.scoring import FantasyPointsEngine
+
+nan = float('nan')
+
+
+def test_points():
+    engine = FantasyPointsEngine([4, 5, 6], modifiers={4: 0.04, 5: 4, 6: -2})
+    # 250 * 0.04 + 2 * 4 - 1 * 2, and a missing value counts as zero.
+    assert engine.points([[250, 2, 1], [300, nan, 0]]).tolist() == pytest.approx([16, 12])
+
+
+def test_points_align_columns():
+    engine = FantasyPointsEngine([4, 5, 6], modifiers={4: 0.04, 5: 4, 6: -2})
+    assert engine.points([[1, 250, 2]], stat_ids=[6, 4, 5]).tolist() == pytest.approx([16])
+    # Stats which aren't given are missing, extra ones are ignored.
+    assert engine.points([[250, 2, 7]], stat_ids=[4, 5, 99]).tolist() == pytest.approx([18])
+
+
+def test_categories():
+    # Lower is better for stat 3, e.g. ERA.
+    engine = FantasyPointsEngine([1, 2, 3], sort_orders={3: False}, scoring_type='head')
+    values = [[10, 5, 3.0],
+              [4, nan, 2.0]]
+    opponent_values = [[8, 5, 2.5],
+                       [4, 1, 3.0]]
+
+    wins, losses, ties = engine.categories(values, opponent_values)
+    assert wins.tolist() == [1, 1]
+    assert losses.tolist() == [1, 0]
+    # A missing value neither wins, loses nor ties.
+    assert ties.tolist() == [1, 1]
+
+
+def _settings(stat_categories, stat_modifiers=None):
+    settings = {
+        'roster_positions': [{'roster_position': {'position': 'QB', 'count': 1}}],
+        'stat_categories': {'stats': [{'stat': dict(category, stat_position_types=[
+            {'stat_position_type': {'position_type': 'O'}}])} for category in stat_categories]},
+    }
+    if stat_modifiers is not None:
+        settings['stat_modifiers'] = {'stats': [
+            {'stat': {'stat_id': stat_id, 'value': value}} for stat_id, value in stat_modifiers]}
+    return [settings]
+
+
+def _league(scoring_type, settings):
+    league = YahooLeagueResource({'league_key': '371.l.1', 'scoring_type': scoring_type}, None)
+    league._parse_settings(settings)
+    return league
+
+
+def test_from_points_league():
+    league = _league('point', _settings(
+        [{'stat_id': 4, 'sort_order': '1'}, {'stat_id': 5, 'sort_order': '1'},
+         {'stat_id': 90, 'sort_order': '1', 'is_only_display_stat': '1'}],
+        [(4, '0.04'), (5, '4')]))
+    engine = FantasyPointsEngine.from_league(league)
+
+    assert engine.is_points
+    # Display only stats aren't scored.
+    assert engine.stat_ids == [4, 5]
+    assert engine.modifiers == {4: 0.04, 5: 4.0}
+    assert engine.points([[250, 2]]).tolist() == pytest.approx([18])
+
+
+def test_from_categories_league():
+    league = _league('head', _settings(
+        [{'stat_id': 7, 'sort_order': '1'}, {'stat_id': 26, 'sort_order': '0'}]))
+    engine = FantasyPointsEngine.from_league(league)
+
+    assert not engine.is_points
+    assert engine.sort_orders == {7: True, 26: False}
+    assert engine.directions.tolist() == [1.0, -1.0]
@@ -0,0 +1,69 @@
+from collections import OrderedDict, namedtuple
+
+import pytest
+
+numpy = pytest.importorskip('numpy')
+
+from YHandler.resources.game import YahooGameStat
+from YHandler.stats import YahooStatsMatrix
+
+Player = namedtuple('Player', ('player_key', 'player_stats'))
+
+
+def player(key, **stats):
+    return Player(key, {'stats': [{'stat_id': str(stat_id[1:]), 'value': value}
+                                  for stat_id, value in sorted(stats.items())]})
+
+
+def categories(*sort_orders):
+    """Stat categories in the given order of (stat ID, sort order)."""
+    return OrderedDict((stat_id, YahooGameStat({'stat_id': stat_id, 'sort_order': sort_order}))
+                       for stat_id, sort_order in sort_orders)
+
+
+PLAYERS = [
+    player('p.1', s1='10', s2='4.50'),
+    player('p.2', s1='-', s2='3.00'),
+    player('p.3', s1='20', s2='6.00'),
+]
+
+
+def test_missing_values():
+    matrix = YahooStatsMatrix.from_players(PLAYERS)
+    assert matrix.stat_ids == [1, 2]
+    assert numpy.isnan(matrix.row('p.2')[0])
+    assert matrix.row('p.3').tolist() == [20.0, 6.0]
+
+
+def test_columns_follow_stat_categories():
+    matrix = YahooStatsMatrix.from_players(PLAYERS, categories((2, '0'), (1, '1'), (3, '1')))
+    assert matrix.stat_ids == [2, 1, 3]
+    assert matrix.row('p.1')[:2].tolist() == [4.5, 10.0]
+    # Stats the players don't have are missing.
+    assert numpy.isnan(matrix.column(3)).all()
+
+
+def test_zscores():
+    # Lower is better for stat 2.
+    matrix = YahooStatsMatrix.from_players(PLAYERS, categories((1, '1'), (2, '0')))
+    zscores = matrix.zscores()
+
+    # Stat 1 is 10 and 20, the missing value is ignored.
+    assert zscores.column(1)[[0, 2]].tolist() == pytest.approx([-1, 1])
+    assert numpy.isnan(zscores.column(1)[1])
+    # Stat 2 has a mean of 4.5, the lowest value has the highest z-score.
+    column = zscores.column(2)
+    assert column[0] == pytest.approx(0)
+    assert column[1] > 0 > column[2]
+
+
+def test_zscores_without_categories():
+    zscores = YahooStatsMatrix.from_players(PLAYERS).zscores()
+    assert zscores.column(2)[1] < 0 < zscores.column(2)[2]
+
+
+def test_rank():
+    matrix = YahooStatsMatrix.from_players(PLAYERS, categories((1, '1'), (2, '0')))
+    # Players without a value are last.
+    assert matrix.rank(1) == ['p.3', 'p.1', 'p.2']
+    assert matrix.rank(2) == ['p.2', 'p.1', 'p.3']
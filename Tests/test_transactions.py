@@ -0,0 +1,115 @@
+from collections import namedtuple
+
+from YHandler import YahooFantasySports
+from YHandler.resources import (YahooAddDropTransaction, YahooLeagueResource,
+                                YahooTradeTransaction, YahooTransactionPoller)
+
+Transaction = namedtuple('Transaction', ('transaction_key', 'timestamp'))
+
+
+class FakeLeague(object):
+    """A league whose transactions are given, newest first."""
+    def __init__(self, transactions):
+        self.transactions = list(transactions)
+        self.arriving = []
+
+    def add(self, transaction):
+        self.transactions.insert(0, transaction)
+
+    def get_transactions(self, types=None, start=None, count=None):
+        start = start or 0
+        page = self.transactions[start:start + count]
+        # E.g. a transaction made while the poller is paging.
+        if self.arriving:
+            self.add(self.arriving.pop(0))
+        return page
+
+
+def test_prime_records_every_transaction_at_the_newest_timestamp():
+    league = FakeLeague([Transaction('t.{0}'.format(i), 100) for i in range(3)] +
+                        [Transaction('t.old', 90)])
+    poller = YahooTransactionPoller(league, page_size=2)
+    poller.prime()
+    assert poller.cursor == (100, frozenset(['t.0', 't.1', 't.2']))
+
+    # A transaction later in the same second is new.
+    league.add(Transaction('t.new', 100))
+    assert [t.transaction_key for t in poller.poll()] == ['t.new']
+    assert poller.poll() == []
+
+
+def test_prime_without_transactions():
+    league = FakeLeague([])
+    poller = YahooTransactionPoller(league)
+    poller.prime()
+
+    league.add(Transaction('t.new', 100))
+    assert [t.transaction_key for t in poller.poll()] == ['t.new']
+
+
+def test_poll_while_transactions_arrive():
+    league = FakeLeague([Transaction('t.old', 90)])
+    poller = YahooTransactionPoller(league, page_size=2)
+    poller.prime()
+
+    for i in reversed(range(4)):
+        league.add(Transaction('t.{0}'.format(i), 100 + 4 - i))
+    league.arriving.append(Transaction('t.new', 200))
+
+    # The second page is shifted by the new transaction, repeating t.1.
+    assert [t.transaction_key for t in poller.poll()] == ['t.0', 't.1', 't.2', 't.3']
+    assert [t.transaction_key for t in poller.poll()] == ['t.new']
+
+
+def transaction_player(player_id, transaction_data):
+    return {'player': [
+        [{'player_key': '371.p.{0}'.format(player_id)}, {'player_id': str(player_id)},
+         {'name': {'full': 'Player {0}'.format(player_id)}}],
+        {'transaction_data': transaction_data}]}
+
+
+TRANSACTIONS = {'league': [{'league_key': '371.l.1'}, {'transactions': {
+    '0': {'transaction': [
+        {'transaction_key': '371.l.1.tr.11', 'transaction_id': '11', 'type': 'trade',
+         'status': 'successful', 'timestamp': '1477000100',
+         'trader_team_key': '371.l.1.t.2', 'tradee_team_key': '371.l.1.t.3'},
+        {'players': {'count': 1, '0': transaction_player(3, {
+            'type': 'trade', 'source_type': 'team', 'source_team_key': '371.l.1.t.2',
+            'destination_type': 'team', 'destination_team_key': '371.l.1.t.3'})}}]},
+    '1': {'transaction': [
+        {'transaction_key': '371.l.1.tr.10', 'transaction_id': '10', 'type': 'add/drop',
+         'status': 'successful', 'timestamp': '1477000000'},
+        {'players': {'count': 2,
+                     # A list with a single item, for some transaction types.
+                     '0': transaction_player(1, [{
+                         'type': 'add', 'source_type': 'freeagents',
+                         'destination_type': 'team', 'destination_team_key': '371.l.1.t.1'}]),
+                     '1': transaction_player(2, {
+                         'type': 'drop', 'source_type': 'team', 'source_team_key': '371.l.1.t.1',
+                         'destination_type': 'waivers'})}}]},
+    'count': 2}}]}
+
+
+def test_get_transactions(stub, authfile):
+    stub.routes['/league/371.l.1/transactions'] = stub.fantasy_content(TRANSACTIONS)
+    handler = YahooFantasySports(authfile, base_url=stub.url)
+    league = YahooLeagueResource({'league_key': '371.l.1'}, handler)
+
+    trade, add_drop = league.get_transactions(types=('add', 'drop', 'trade'), count=2)
+    assert stub.requests() == ['/league/371.l.1/transactions;types=add,drop,trade;count=2?format=json']
+
+    assert isinstance(trade, YahooTradeTransaction)
+    assert trade.timestamp == 1477000100
+    assert trade.trader_team_key == '371.l.1.t.2'
+    assert trade.team_keys == set(['371.l.1.t.2', '371.l.1.t.3'])
+
+    assert isinstance(add_drop, YahooAddDropTransaction)
+    assert add_drop.transaction_key == '371.l.1.tr.10'
+    [added] = add_drop.added
+    assert added.player_key == '371.p.1'
+    assert added.destination_team_key == '371.l.1.t.1'
+    assert added.source_team_key is None
+    [dropped] = add_drop.dropped
+    assert dropped.name['full'] == 'Player 2'
+    assert dropped.destination_type == 'waivers'
+    assert add_drop.team_keys == set(['371.l.1.t.1'])
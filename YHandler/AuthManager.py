@@ -1,6 +1,16 @@
 import json
 import csv
+import os
+import tempfile
+import threading
 from abc import ABCMeta, abstractmethod
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # Not available on Windows, only lock between threads there.
+    fcntl = None
 
 
 class AuthManager:
@@ -21,6 +31,14 @@ class AuthManager:
     def write_authvals(self, authd):
         pass
 
+    @contextmanager
+    def lock(self):
+        """
+        Held while the access token is refreshed, managers shared between
+        processes should override this to exclude the other processes.
+        """
+        yield
+
 
 class CSVAuthManager(AuthManager):
     """
@@ -71,3 +89,73 @@ class JsonAuthManager(AuthManager):
     def write_authvals(self, authd):
         with open(self.authf, 'wb') as f:
             json.dump(authd, f)
+
+
+class LockingJsonAuthManager(JsonAuthManager):
+    """
+    Authorization Manager for Json files shared by several processes.
+
+    Writes go to a temporary file which then replaces the original, so readers
+    never see a partially written file. :meth:`lock` takes an exclusive lock on
+    a ``.lock`` file next to the authorization file, so only one process
+    refreshes the token while the others wait and then pick up the new token.
+    Values are cached in memory and only re-read when the file changes, which
+    is detected by its modification time, inode (each write replaces the
+    file) and size, as the modification time alone may not change between two
+    writes on filesystems with coarse timestamps.
+    """
+
+    def __init__(self, authf):
+        super(LockingJsonAuthManager, self).__init__(authf)
+        self.lockf = authf + '.lock'
+        self._thread_lock = threading.Lock()
+        self._cached = None
+        self._cached_stat = None
+
+    def _stat(self):
+        """What identifies a version of the authorization file."""
+        st = os.stat(self.authf)
+        return st.st_mtime, st.st_ino, st.st_size
+
+    def get_authvals(self):
+        """
+        Read authorization parameters from the json authorization file, if it
+        changed since it was last read.
+        :return: a dictionary containing oauth parameters
+        """
+        stat = self._stat()
+        if self._cached is None or stat != self._cached_stat:
+            self._cached = super(LockingJsonAuthManager, self).get_authvals()
+            self._cached_stat = stat
+        return dict(self._cached)
+
+    def write_authvals(self, authd):
+        dirname = os.path.dirname(os.path.abspath(self.authf))
+        f = tempfile.NamedTemporaryFile('wb', dir=dirname, prefix='.auth', delete=False)
+        try:
+            with f:
+                json.dump(authd, f)
+                f.flush()
+                os.fsync(f.fileno())
+            # Atomic on POSIX, readers see either the old or the new file.
+            os.rename(f.name, self.authf)
+        except Exception:
+            os.remove(f.name)
+            raise
+
+        self._cached = dict(authd)
+        self._cached_stat = self._stat()
+
+    @contextmanager
+    def lock(self):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+
+            with open(self.lockf, 'a') as f:
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f.fileno(), fcntl.LOCK_UN)
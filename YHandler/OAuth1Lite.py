@@ -1,7 +1,10 @@
 from __future__ import absolute_import
 
+import binascii
+import hashlib
+import hmac
 from urllib import quote
-from urlparse import parse_qs, urlparse, urlunparse
+from urlparse import parse_qs, parse_qsl, urlparse, urlunparse
 
 from oauthlib.common import generate_nonce, generate_timestamp
 from oauthlib.oauth1.rfc5849.signature import (construct_base_string,
@@ -9,6 +12,7 @@ from oauthlib.oauth1.rfc5849.signature import (construct_base_string,
                                                normalize_parameters,
                                                sign_hmac_sha1)
 from oauthlib.oauth1.rfc5849.parameters import prepare_headers
+from oauthlib.oauth1.rfc5849.utils import escape
 
 from requests.auth import AuthBase
 
@@ -111,3 +115,69 @@ class OAuth1Lite(AuthBase):
     def sign_and_create_authorization_header(self, url, token_secret, method=u'POST', signature_method=u'HMAC-SHA1'):
         self.sign(url, token_secret, method, signature_method)
         return self.create_authorization_header()
+
+
+class OAuth1Signer(AuthBase):
+    """
+    A reusable HMAC-SHA1 signer for a single set of credentials.
+
+    Unlike :class:`OAuth1Lite`, which accumulates parameters as it is used and
+    so must be re-created for every request, this is built once per access
+    token: the HMAC key and the static part of the authorization header are
+    computed up front, and everything specific to a request (nonce, timestamp,
+    query parameters, signature) is kept local to that call. It holds no
+    mutable state, so one instance can sign requests from many threads at once.
+    """
+    def __init__(self, client_key, client_secret, oauth_token='', oauth_token_secret=''):
+        self.client_key = unicode(client_key)
+        self.oauth_token = unicode(oauth_token)
+
+        self._static_params = [
+            (u'oauth_consumer_key', self.client_key),
+            (u'oauth_signature_method', u'HMAC-SHA1'),
+            (u'oauth_version', u'1.0'),
+            ]
+        if oauth_token:
+            self._static_params.append((u'oauth_token', self.oauth_token))
+        self._static_header = u'OAuth ' + u', '.join(
+            u'{0}="{1}"'.format(escape(k), escape(v)) for (k, v) in self._static_params)
+
+        key = escape(unicode(client_secret)) + u'&' + escape(unicode(oauth_token_secret))
+        self._hmac = hmac.new(key.encode('utf-8'), digestmod=hashlib.sha1)
+
+    def __call__(self, request):
+        """Add the authorization header to a request prepared by the requests library."""
+        request.headers['Authorization'] = self.sign(request.url, request.method)
+        return request
+
+    def signature(self, url, method, params):
+        """
+        :param: url - request url, any query parameters must also be in params
+        :param: method - request method (i.e. POST, GET)
+        :param: params - list of (name, value) unicode pairs to sign
+        :returns the base64 encoded HMAC-SHA1 signature
+        """
+        base_string = construct_base_string(unicode(method),
+                                            normalize_base_string_uri(unicode(url)),
+                                            normalize_parameters(params))
+        mac = self._hmac.copy()
+        mac.update(base_string.encode('utf-8'))
+        return binascii.b2a_base64(mac.digest())[:-1].decode('utf-8')
+
+    def sign(self, url, method=u'GET'):
+        """
+        Sign a request to the url, which may include query parameters.
+        :returns the value of the Authorization header
+        """
+        nonce = generate_nonce()
+        timestamp = generate_timestamp()
+
+        params = [(k.decode('utf-8'), v.decode('utf-8'))
+                  for (k, v) in parse_qsl(urlparse(url).query, keep_blank_values=True)]
+        params.extend(self._static_params)
+        params.append((u'oauth_nonce', nonce))
+        params.append((u'oauth_timestamp', timestamp))
+
+        signature = self.signature(url, method, params)
+        return u'{0}, oauth_nonce="{1}", oauth_timestamp="{2}", oauth_signature="{3}"'.format(
+            self._static_header, escape(nonce), escape(timestamp), escape(signature))
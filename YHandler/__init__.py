@@ -1,3 +1,4 @@
 from __future__ import absolute_import
 
 from YHandler.base import YahooFantasySports
+from YHandler.concurrency import AsyncYahooFantasySports
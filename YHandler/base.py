@@ -1,36 +1,165 @@
+import copy
 from os.path import splitext
+import threading
+import time
 from urlparse import parse_qs, urljoin
+import weakref
 import webbrowser
 
 import requests
 
-from YHandler.OAuth1Lite import OAuth1Lite
+from YHandler.OAuth1Lite import OAuth1Lite, OAuth1Signer
 from YHandler.AuthManager import CSVAuthManager, JsonAuthManager
 from YHandler.resources import YahooGameResource
+from YHandler.resources.base import ResourceContext
+from YHandler.decoding import iter_collection, loads
+from YHandler.metrics import RequestEvent
+from YHandler.ratelimit import THROTTLE_STATUS_CODES, RateLimiter
+from YHandler.resources.league import _get_players_by_key
+from YHandler.transport import SessionTransport
 
 GET_TOKEN_URL = 'https://api.login.yahoo.com/oauth/v2/get_token'
 AUTHORIZATION_URL = 'https://api.login.yahoo.com/oauth/v2/request_auth'
 REQUEST_TOKEN_URL = 'https://api.login.yahoo.com/oauth/v2/get_request_token'
 CALLBACK_URL = 'oob'
 
+# Refresh the access token this many seconds before it expires.
+REFRESH_MARGIN = 60
+
+# After failing to refresh an access token, wait this many seconds before
+# trying to refresh it again.
+REFRESH_RETRY_AFTER = 60
+
 
 class YahooApiException(Exception):
     pass
 
 
+class _Flight(object):
+    """A request in progress, which identical concurrent requests wait for."""
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+        # The number of requests waiting, guarded by the handler's in-flight lock.
+        self.followers = 0
+
+    def wait(self):
+        """:returns a copy of the result, so that callers can't modify each other's"""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return copy.deepcopy(self.result)
+
+
 class YahooFantasySports:
     _base_url = 'https://fantasysports.yahooapis.com/fantasy/v2/'
     _format = 'json'
 
-    def __init__(self, authf='auth.json'):
+    def __init__(self, authf='auth.json', transport=None, base_url=None, cache=None,
+                 rate_limiter=None, authc=None, decoder=None):
+        """
+        :param: authf - path to the authorization file (.json or .csv)
+        :param: transport - a SessionTransport (or compatible object) used to send
+                all requests, defaults to a new pooled SessionTransport
+        :param: base_url - overrides the fantasy API root, e.g. to point at a
+                local stub server
+        :param: cache - an optional ResponseCache for the results of GET requests
+        :param: rate_limiter - a RateLimiter shared by all requests of this handler,
+                defaults to a new RateLimiter
+        :param: authc - an AuthManager to use instead of choosing one from the
+                extension of authf, e.g. a LockingJsonAuthManager
+        :param: decoder - function to decode JSON response bodies, defaults to
+                the fastest one available (orjson, ujson or json)
+        """
+        if base_url:
+            self._base_url = base_url
+
         ext = splitext(authf)[-1].lower()
-        if ext == '.csv':
+        if authc is not None:
+            self.authc = authc
+        elif ext == '.csv':
             self.authc = CSVAuthManager(authf)
         elif ext == '.json':
             self.authc = JsonAuthManager(authf)
         else:
             self.authc = CSVAuthManager(authf)
         self.authd = self.authc.get_authvals()
+        self._refresh_lock = threading.Lock()
+        # The access token which last failed to refresh, and when to try again.
+        self._refresh_failure = (None, 0)
+        self._signer = None
+
+        if transport is None:
+            transport = SessionTransport()
+        self.transport = transport
+        self.cache = cache
+        self.decoder = decoder or loads
+
+        if rate_limiter is None:
+            rate_limiter = RateLimiter()
+        self.rate_limiter = rate_limiter
+        self._hooks = []
+        # Identical GET requests in progress, by (method, querystring, data).
+        self._inflight = {}
+        self._inflight_lock = threading.Lock()
+        # The game, player and team resources in use, by key.
+        self._identities = weakref.WeakValueDictionary()
+        self._identities_lock = threading.Lock()
+        # Shared by the resources fetched directly from this handler.
+        self._context = ResourceContext(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        """Release the pooled connections held by this handler."""
+        self.transport.close()
+
+    def add_hook(self, hook):
+        """
+        Call hook with a RequestEvent after every api_req (and api_req_iter),
+        whether it succeeded or not, e.g. a MetricsCollector. Hooks are called
+        from the requesting thread, so must be thread safe if requests are made
+        concurrently.
+        :param: hook - function taking a RequestEvent
+        """
+        self._hooks.append(hook)
+
+    def remove_hook(self, hook):
+        self._hooks.remove(hook)
+
+    def _new_event(self, querystring, req_meth):
+        """:returns a RequestEvent if there are any hooks to report it to, otherwise None"""
+        if not self._hooks:
+            return None
+        return RequestEvent(querystring, req_meth)
+
+    def _emit(self, event):
+        event.finish()
+        for hook in list(self._hooks):
+            hook(event)
+
+    def _canonical(self, resource, key):
+        """
+        The identity map of resources: a resource is only kept while it is
+        referenced elsewhere.
+        :param: resource - a newly parsed resource
+        :param: key - the key identifying it, e.g. (league_key, player_key)
+        :returns the resource already in use with the same key and type, with the
+                 data of the new resource merged into it, otherwise resource
+        """
+        with self._identities_lock:
+            existing = self._identities.get(key)
+            if existing is None or type(existing) is not type(resource):
+                self._identities[key] = resource
+                return resource
+
+            existing._merge(resource)
+            return existing
 
     def reg_user(self):
         """
@@ -42,7 +171,7 @@ class YahooFantasySports:
         # step #1: Signup and get token https://developer.yahoo.com/oauth/guide/oauth-auth-flow.html
         # step #2: Get a request token https://developer.yahoo.com/oauth/guide/oauth-requesttoken.html
         oauth_request = OAuth1Lite(self.authd['consumer_key'], self.authd['consumer_secret'], callback=CALLBACK_URL)
-        response = requests.post(REQUEST_TOKEN_URL, auth=oauth_request)
+        response = self.transport.request('POST', REQUEST_TOKEN_URL, auth=oauth_request)
         if response.status_code != requests.codes['ok']:
             return response
         qs = parse_qs(response.text)
@@ -65,15 +194,10 @@ class YahooFantasySports:
         oauth_access = OAuth1Lite(self.authd['consumer_key'], self.authd['consumer_secret'],
                                   self.authd['oauth_token'], self.authd['oauth_token_secret'])
         oauth_access.add_param('oauth_verifier', self.authd['oauth_verifier'])
-        response = requests.post(GET_TOKEN_URL, auth=oauth_access)
+        response = self.transport.request('POST', GET_TOKEN_URL, auth=oauth_access)
         if response.status_code != requests.codes['ok']:
             return response
-        qs = parse_qs(response.content)
-        self.authd['oauth_access_token'] = qs['oauth_token'][0]
-        self.authd['oauth_access_token_secret'] = qs['oauth_token_secret'][0]
-        self.authd['oauth_session_handle'] = qs['oauth_session_handle'][0]
-        if self.authc:
-            self.authc.write_authvals(self.authd)
+        self._store_token(parse_qs(response.content))
         return response
 
     def refresh_token(self):
@@ -87,58 +211,174 @@ class YahooFantasySports:
         oauth_refresh = OAuth1Lite(self.authd['consumer_key'], self.authd['consumer_secret'],
                                    self.authd['oauth_access_token'], self.authd['oauth_access_token_secret'])
         oauth_refresh.add_param('oauth_session_handle', self.authd['oauth_session_handle'])
-        response = requests.post(GET_TOKEN_URL, auth=oauth_refresh)
+        response = self.transport.request('POST', GET_TOKEN_URL, auth=oauth_refresh)
         if response.status_code != requests.codes['ok']:
             return response
-        qs = parse_qs(response.content)
-        self.authd['oauth_access_token'] = qs['oauth_token'][0]
-        self.authd['oauth_access_token_secret'] = qs['oauth_token_secret'][0]
-        self.authd['oauth_session_handle'] = qs['oauth_session_handle'][0]
+        self._store_token(parse_qs(response.content))
+        return response
+
+    def _store_token(self, qs):
+        """
+        Save the access token from a get_token response, along with when it and
+        the session handle expire.
+        :param: qs - the parsed response
+        """
+        now = time.time()
+        authd = dict(self.authd)
+        authd['oauth_access_token'] = qs['oauth_token'][0]
+        authd['oauth_access_token_secret'] = qs['oauth_token_secret'][0]
+        authd['oauth_session_handle'] = qs['oauth_session_handle'][0]
+        if 'oauth_expires_in' in qs:
+            authd['oauth_expires_at'] = now + int(qs['oauth_expires_in'][0])
+        if 'oauth_authorization_expires_in' in qs:
+            authd['oauth_authorization_expires_at'] = now + int(qs['oauth_authorization_expires_in'][0])
+
+        # Replace, instead of update, so other threads never see half a token.
+        self.authd = authd
         if self.authc:
             self.authc.write_authvals(self.authd)
-        return response
 
-    def _call_api(self, url, req_meth, data, headers):
+    def _token_expiring(self):
+        """Whether the access token expires within REFRESH_MARGIN seconds."""
+        expires_at = self.authd.get('oauth_expires_at')
+        return expires_at is not None and time.time() >= float(expires_at) - REFRESH_MARGIN
+
+    def _refresh_token_once(self, stale_token):
+        """
+        Refresh the access token, unless another caller already replaced the
+        stale token. Only one refresh runs at a time (across processes, if the
+        auth manager supports it), other callers wait for it to finish and then
+        use its result. If refreshing fails, it isn't tried again for the same
+        token until REFRESH_RETRY_AFTER seconds have passed.
+        :param: stale_token - the access token which needs replacing
+        :returns whether the access token was replaced
+        """
+        with self._refresh_lock:
+            if self.authd.get('oauth_access_token') != stale_token:
+                return True
+
+            failed_token, retry_at = self._refresh_failure
+            if failed_token == stale_token and time.time() < retry_at:
+                return False
+
+            with self.authc.lock():
+                # Another process sharing the credentials may have refreshed
+                # the token while we were waiting.
+                stored = self.authc.get_authvals()
+                if stored.get('oauth_access_token') not in (None, stale_token):
+                    self.authd = stored
+                    return True
+
+                response = self.refresh_token()
+                if response.status_code != requests.codes['ok']:
+                    self._refresh_failure = (stale_token, time.time() + REFRESH_RETRY_AFTER)
+                    return False
+                return True
+
+    def _get_signer(self):
+        """:returns the OAuth1Signer for the current access token, creating it if needed"""
+        authd = self.authd
+        signer = self._signer
+        if signer is None or signer.oauth_token != authd['oauth_access_token']:
+            signer = OAuth1Signer(authd['consumer_key'],
+                                  authd['consumer_secret'],
+                                  authd['oauth_access_token'],
+                                  authd['oauth_access_token_secret'])
+            self._signer = signer
+        return signer
+
+    def _call_api(self, url, req_meth, data, headers, stream=False, event=None):
         """
         Makes an the request to the yahoo api using oauth credentials
         :param: url - request url
         :param: req_meth - request method to used
         :param: data - additional fields to send with the request
         :param: headers - additional headers to send with the request
+        :param: stream - if True, the body is not read until it is accessed
+        :param: event - a RequestEvent to record the signing and network time in
         :returns Response object
         """
-        oauth_api = OAuth1Lite(self.authd['consumer_key'],
-                               self.authd['consumer_secret'],
-                               self.authd['oauth_access_token'],
-                               self.authd['oauth_access_token_secret'])
-        return requests.request(method=req_meth, url=url,
-                                data=data, headers=headers,
-                                auth=oauth_api,
-                                params={'format': self._format})
+        auth = self._get_signer()
+        if event is None:
+            return self.transport.request(req_meth, url,
+                                          data=data, headers=headers,
+                                          auth=auth,
+                                          params={'format': self._format},
+                                          stream=stream)
 
-    def api_req(self, querystring, req_meth='GET', data={}, headers={}):
+        # Signing happens within the transport, so subtract it from the network time.
+        signing = event.timings.get('sign', 0.0)
+        start = time.time()
+        response = self.transport.request(req_meth, url,
+                                          data=data, headers=headers,
+                                          auth=event.timed('sign', auth),
+                                          params={'format': self._format},
+                                          stream=stream)
+        signing = event.timings.get('sign', 0.0) - signing
+        event.add_time('network', time.time() - start - signing)
+        return response
+
+    def _send(self, url, req_meth, data, headers, stream=False, event=None):
         """
-        Sends the specified querysting to the yahoo fantasy api and returns
-        the response. This should be used after authorization is complete.
-        :param: querystring - query string to send
-        :param: req_meth - request method to used
-        :param: data - additional fields to send with the request
-        :param: headers - additional headers to send with the request
+        Send a request, waiting for the rate limiter and retrying (with backoff)
+        while the response says that we're being throttled.
         :returns Response object
         """
+        acquire = self.rate_limiter.acquire
+        if event is not None:
+            acquire = event.timed('wait', acquire)
+
+        attempt = 0
+        while True:
+            acquire()
+            response = self._call_api(url, req_meth, data=data, headers=headers, stream=stream,
+                                      event=event)
+            if (response.status_code not in THROTTLE_STATUS_CODES or
+                    attempt >= self.rate_limiter.max_retries):
+                return response
+
+            # Release the connection, a streamed response holds on to it until closed.
+            response.close()
+            self.rate_limiter.backoff(attempt, response.headers.get('Retry-After'))
+            attempt += 1
+            if event is not None:
+                event.retries += 1
+
+    def _request(self, querystring, req_meth, data, headers, stream=False, event=None):
+        """
+        Send the querystring, handling authentication, throttling and errors.
+        :param: event - a RequestEvent to record what happened in
+        :returns Response object, which is always OK
+        """
+        refresh = self._refresh_token_once
+        if event is not None:
+            refresh = event.timed('refresh', refresh)
+
         # Enforce authentication has happened.
         if ('oauth_access_token' not in self.authd) or ('oauth_access_token_secret' not in self.authd) or (not (self.authd['oauth_access_token'] and self.authd['oauth_access_token_secret'])):
             self.reg_user()
 
+        # Refresh shortly before the access token expires, instead of waiting
+        # for a request to be rejected.
+        if self._token_expiring():
+            refresh(self.authd['oauth_access_token'])
+
         url = urljoin(self._base_url, querystring)
-        response = self._call_api(url, req_meth, data=data, headers=headers)
+        token = self.authd['oauth_access_token']
+        response = self._send(url, req_meth, data, headers, stream, event)
 
         # Both authtokens exist, but the request was rejected. Assume the token
         # expired, request a new one and try again.
         # TODO This could be a LOT more robust.
-        if response.status_code != requests.codes['ok']:
-            self.refresh_token()
-            response = self._call_api(url, req_meth, data=data, headers=headers)
+        if (response.status_code != requests.codes['ok'] and
+                response.status_code not in THROTTLE_STATUS_CODES and
+                refresh(token)):
+            response = self._send(url, req_meth, data, headers, stream, event)
+            if event is not None:
+                event.refreshed = True
+
+        if event is not None:
+            event.status = response.status_code
 
         # If the response code is still not OK, then nothing we can do.
         if response.status_code != requests.codes['ok']:
@@ -151,15 +391,166 @@ class YahooFantasySports:
             raise YahooApiException(
                 '{0}: {1}'.format(response.status_code, message))
 
+        return response
+
+    def api_req(self, querystring, req_meth='GET', data={}, headers={}):
+        """
+        Sends the specified querysting to the yahoo fantasy api and returns
+        the response. This should be used after authorization is complete.
+        Concurrent identical GET requests (e.g. from other threads) share a
+        single request, each receiving a copy of its result.
+        :param: querystring - query string to send
+        :param: req_meth - request method to used
+        :param: data - additional fields to send with the request
+        :param: headers - additional headers to send with the request
+        :returns Response object
+        """
+        event = self._new_event(querystring, req_meth)
+        if event is None:
+            return self._coalesced_api_req(querystring, req_meth, data, headers)
+
+        try:
+            return self._coalesced_api_req(querystring, req_meth, data, headers, event)
+        except Exception as e:
+            event.error = e
+            raise
+        finally:
+            self._emit(event)
+
+    def _coalesced_api_req(self, querystring, req_meth, data, headers, event=None):
+        """Make the request, or wait for an identical one which is in progress."""
+        # Only requests without side effects can be shared.
+        if req_meth != 'GET':
+            return self._api_req(querystring, req_meth, data, headers, event)
+
+        frozen_data = data
+        if isinstance(data, dict):
+            frozen_data = tuple(sorted(data.items()))
+        key = (req_meth, querystring, frozen_data)
+        with self._inflight_lock:
+            flight = self._inflight.get(key)
+            if flight is None:
+                flight = self._inflight[key] = _Flight()
+                leader = True
+            else:
+                flight.followers += 1
+                leader = False
+
+        if not leader:
+            if event is None:
+                return flight.wait()
+            event.coalesced = True
+            return event.timed('coalesce', flight.wait)()
+
+        try:
+            result = self._api_req(querystring, req_meth, data, headers, event)
+        except Exception as e:
+            flight.error = e
+            raise
+        else:
+            flight.result = result
+        finally:
+            with self._inflight_lock:
+                del self._inflight[key]
+                followers = flight.followers
+            flight.done.set()
+
+        # Resources modify the data they're built from, so while followers copy
+        # the result the leader needs its own. Once the flight is removed no
+        # more can join, so without any the result is the leader's alone.
+        if followers:
+            return copy.deepcopy(result)
+        return result
+
+    def _api_req(self, querystring, req_meth, data, headers, event=None):
+        use_cache = self.cache is not None and req_meth == 'GET'
+        if use_cache:
+            cache_get, cache_set = self.cache.get, self.cache.set
+            if event is not None:
+                cache_get = event.timed('cache', cache_get)
+                cache_set = event.timed('cache', cache_set)
+
+            result = cache_get(querystring)
+            if result is not None:
+                if event is not None:
+                    event.cache_hit = True
+                return result
+
+        response = self._request(querystring, req_meth, data, headers, event=event)
+
         # The response is in JSON, but always encapsulated at a top-level
         # 'fantasy_content' element.
-        return response.json()['fantasy_content']
+        decode = self.decoder
+        if event is not None:
+            event.bytes = len(response.content)
+            decode = event.timed('decode', decode)
+        result = decode(response.content)['fantasy_content']
+        if use_cache:
+            cache_set(querystring, result)
+        return result
+
+    def api_req_iter(self, querystring, path):
+        """
+        Sends the specified querystring (as a GET) and yields the items of a
+        collection in the response as they are parsed, instead of decoding the
+        whole response first. Requires ijson to be installed to be incremental.
+        The cache is not used.
+        :param: querystring - query string to send
+        :param: path - location of the collection under 'fantasy_content', in
+                ijson notation, e.g. 'league.item.players'
+        :returns generator of the raw collection items, e.g. {'player': [...]}
+        """
+        event = self._new_event(querystring, 'GET')
+        try:
+            response = self._request(querystring, 'GET', {}, {}, stream=True, event=event)
+        except Exception as e:
+            if event is not None:
+                event.error = e
+                self._emit(event)
+            raise
+
+        # Parsing is interleaved with the caller's processing of each item, so
+        # isn't timed.
+        if event is not None:
+            length = response.headers.get('Content-Length')
+            if length is not None and not response.headers.get('Content-Encoding'):
+                event.bytes = int(length)
+            self._emit(event)
+
+        try:
+            # Let urllib3 undo any gzip encoding.
+            response.raw.decode_content = True
+            for item in iter_collection(response.raw, 'fantasy_content.' + path):
+                yield item
+        finally:
+            response.close()
+
+    def invalidate(self, pattern=None):
+        """
+        Drop cached results whose query string matches the regular expression
+        pattern, or all cached results if no pattern is given.
+        """
+        if self.cache is not None:
+            self.cache.invalidate(pattern)
 
     def get_game(self, game_key):
         data = self.api_req('game/' + game_key)
         game = data['game'][0]
 
-        return YahooGameResource(game, parent=self)
+        return YahooGameResource(game, parent=self)._canonical()
+
+    def get_players(self, player_keys, out=('stats', 'percent_owned'), week=None):
+        """
+        Fetch many players, along with their sub-resources, outside of a league
+        context. Keys are sent in chunks, so any number may be given.
+        :param: player_keys - iterable of player keys
+        :param: out - sub-resources to include, e.g. 'stats' or 'percent_owned'
+        :param: week - if given, stats are for this week instead of the season
+        :returns: list of YahooPlayerResource, in the order given
+        """
+        return _get_players_by_key(
+            self.api_req, self, player_keys, out, week,
+            lambda data: data['players'])
 
     def get_games(self, available_only=False):
         """
@@ -0,0 +1,197 @@
+from __future__ import absolute_import
+
+from collections import OrderedDict
+import json
+import re
+import sqlite3
+import threading
+import time
+
+MINUTE = 60
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# Time-to-live rules, as (regular expression, seconds), matched in order against
+# the query string of a request. The first match wins.
+DEFAULT_TTL_RULES = [
+    # Game metadata is fixed for the season.
+    (r'^game/[^/;]+/(game_weeks|stat_categories|position_types|roster_positions)$', 7 * DAY),
+    (r'^game/[^/;]+;out=[\w,]+$', 7 * DAY),
+    (r'^game/[^/;]+$', DAY),
+    # League settings change very rarely.
+    (r'^league/[^/;]+/settings$', DAY),
+    # Teams and standings change a few times a day.
+    (r'^league/[^/;]+/(teams|standings)$', HOUR),
+]
+
+
+class LRUCache(object):
+    """
+    An in-memory store which holds at most ``maxsize`` entries, evicting the
+    least recently used entry when full.
+    """
+    def __init__(self, maxsize=1024):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """:returns (value, expires) tuple or None"""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                # Re-insert to mark as most recently used.
+                self._entries[key] = entry
+            return entry
+
+    def set(self, key, value, expires):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, expires)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries.keys())
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache(object):
+    """
+    An on-disk store backed by a SQLite database, this survives restarts and
+    can be shared by several processes.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._conn:
+            self._conn.execute(
+                'CREATE TABLE IF NOT EXISTS cache '
+                '(key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL)')
+
+    def get(self, key):
+        """:returns (value, expires) tuple or None"""
+        with self._lock:
+            row = self._conn.execute(
+                'SELECT value, expires FROM cache WHERE key = ?', (key,)).fetchone()
+        return tuple(row) if row else None
+
+    def set(self, key, value, expires):
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)',
+                (key, value, expires))
+
+    def delete(self, key):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def keys(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute('SELECT key FROM cache')]
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM cache')
+
+    def close(self):
+        self._conn.close()
+
+
+class ResponseCache(object):
+    """
+    Caches the decoded results of :meth:`~YHandler.base.YahooFantasySports.api_req`
+    by query string.
+
+    Lookups go to the in-memory ``memory`` store first, then to the optional
+    ``disk`` store (hits there are promoted into memory). Only query strings
+    matching one of the ``rules`` are cached, for the time-to-live given by the
+    rule. Values are stored as JSON text, so every hit returns a fresh copy
+    which callers are free to modify.
+
+    Parameters:
+        ``memory`` (:class:`LRUCache`):
+            The first tier, defaults to an :class:`LRUCache` of 1024 entries.
+        ``disk`` (:class:`SQLiteCache`):
+            The optional second tier.
+        ``rules`` (:class:`list` of :class:`tuple`):
+            (regular expression, seconds) pairs, defaults to
+            :data:`DEFAULT_TTL_RULES`.
+
+    """
+    def __init__(self, memory=None, disk=None, rules=None):
+        if memory is None:
+            memory = LRUCache()
+        self.memory = memory
+        self.disk = disk
+
+        if rules is None:
+            rules = DEFAULT_TTL_RULES
+        self.rules = [(re.compile(pattern), ttl) for pattern, ttl in rules]
+
+    @property
+    def _tiers(self):
+        return [tier for tier in (self.memory, self.disk) if tier is not None]
+
+    def ttl(self, querystring):
+        """:returns the time-to-live of a query string in seconds, or None if it isn't cacheable"""
+        for pattern, ttl in self.rules:
+            if pattern.search(querystring):
+                return ttl
+        return None
+
+    def get(self, querystring):
+        """:returns the cached result of the query string, or None"""
+        now = time.time()
+        for i, tier in enumerate(self._tiers):
+            entry = tier.get(querystring)
+            if entry is None:
+                continue
+
+            value, expires = entry
+            if expires <= now:
+                tier.delete(querystring)
+                continue
+
+            # Promote to the faster tiers.
+            for faster in self._tiers[:i]:
+                faster.set(querystring, value, expires)
+            return json.loads(value)
+
+        return None
+
+    def set(self, querystring, result):
+        """Store the result of a query string, if there's a rule for it."""
+        ttl = self.ttl(querystring)
+        if not ttl:
+            return
+
+        value = json.dumps(result)
+        expires = time.time() + ttl
+        for tier in self._tiers:
+            tier.set(querystring, value, expires)
+
+    def invalidate(self, pattern=None):
+        """
+        Remove cached results.
+        :param: pattern - regular expression of the query strings to remove,
+                removes everything if not given
+        """
+        for tier in self._tiers:
+            if pattern is None:
+                tier.clear()
+                continue
+
+            regex = re.compile(pattern)
+            for key in tier.keys():
+                if regex.search(key):
+                    tier.delete(key)
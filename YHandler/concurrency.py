@@ -0,0 +1,93 @@
+from __future__ import absolute_import
+
+from multiprocessing.pool import ThreadPool
+
+from YHandler.base import YahooFantasySports
+from YHandler.transport import SessionTransport
+
+
+class AsyncYahooFantasySports(YahooFantasySports):
+    """
+    A :class:`~YHandler.base.YahooFantasySports` handler which can run many
+    requests at once.
+
+    Requests are dispatched to a bounded pool of worker threads sharing one
+    pooled :class:`~YHandler.transport.SessionTransport`, so at most
+    ``max_concurrency`` requests are in flight at any time. Each asynchronous
+    method returns a :class:`multiprocessing.pool.AsyncResult`, call ``get()``
+    on it (or pass a list of them to :meth:`gather`) to wait for the result.
+
+    Any blocking resource method can be run concurrently via :meth:`submit`,
+    e.g. ``handler.submit(team.get_roster, week='3')``.
+
+    """
+    def __init__(self, authf='auth.json', max_concurrency=8, transport=None, **kwargs):
+        """
+        :param: max_concurrency - the maximum number of requests in flight
+        See :class:`~YHandler.base.YahooFantasySports` for the other parameters.
+        """
+        if transport is None:
+            transport = SessionTransport(pool_maxsize=max_concurrency)
+        YahooFantasySports.__init__(self, authf, transport=transport, **kwargs)
+
+        self.max_concurrency = max_concurrency
+        self._pool = None
+
+    @property
+    def pool(self):
+        """The worker thread pool, created on first use."""
+        if self._pool is None:
+            self._pool = ThreadPool(self.max_concurrency)
+        return self._pool
+
+    def close(self):
+        """Wait for outstanding requests, then release the workers and connections."""
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+        YahooFantasySports.close(self)
+
+    def submit(self, func, *args, **kwargs):
+        """
+        Run ``func(*args, **kwargs)`` on a worker thread.
+        :returns AsyncResult
+        """
+        return self.pool.apply_async(func, args, kwargs)
+
+    def gather(self, results, timeout=None):
+        """
+        Wait for every AsyncResult in ``results``, re-raising the first error.
+        :returns list of results, in the same order
+        """
+        return [result.get(timeout) for result in results]
+
+    def api_req_async(self, querystring, req_meth='GET', data={}, headers={}):
+        """
+        The asynchronous counterpart of :meth:`api_req`.
+        :returns AsyncResult which resolves to the 'fantasy_content' of the response
+        """
+        return self.submit(self.api_req, querystring, req_meth, data, headers)
+
+    def api_reqs(self, querystrings):
+        """
+        Send GET requests for all of the query strings concurrently.
+        :returns list of the 'fantasy_content' of each response, in order
+        """
+        return self.gather([self.api_req_async(q) for q in querystrings])
+
+    def get_rosters(self, teams, week=None, date=None):
+        """
+        Fetch the roster of every team concurrently.
+        :param: teams - iterable of YahooTeamResource
+        :returns list of YahooRosterResource, in the same order as teams
+        """
+        return self.gather([self.submit(t.get_roster, week, date) for t in teams])
+
+    def get_stats(self, players, week=None):
+        """
+        Fetch the stats of every player concurrently.
+        :param: players - iterable of YahooPlayerResource
+        :returns list of stats, in the same order as players
+        """
+        return self.gather([self.submit(p.get_stats, week) for p in players])
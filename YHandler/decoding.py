@@ -0,0 +1,124 @@
+"""
+JSON decoding of API responses.
+
+The fastest available decoder is used for whole responses: orjson, then ujson,
+then the standard library. Large collections can instead be parsed
+incrementally with :func:`iter_collection`, which requires ijson.
+"""
+from __future__ import absolute_import
+
+import json
+from decimal import Decimal
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:
+    try:
+        import ujson
+        loads = ujson.loads
+    except ImportError:
+        loads = json.loads
+
+try:
+    from ijson.common import ObjectBuilder
+    try:
+        import ijson.backends.yajl2_cffi as ijson
+    except ImportError:
+        try:
+            import ijson.backends.yajl2_c as ijson
+        except ImportError:
+            import ijson
+except ImportError:
+    ijson = None
+
+
+def _iter_wrapped(data):
+    """Yield the items of a count-wrapped array, or a plain list."""
+    if isinstance(data, list):
+        for item in data:
+            yield item
+    elif isinstance(data, dict):
+        for i in range(data['count']):
+            yield data[str(i)]
+
+
+def _find(data, parts):
+    """Yield the values found at an ijson style path in decoded data."""
+    if not parts:
+        yield data
+        return
+
+    part, rest = parts[0], parts[1:]
+    if part == 'item' and isinstance(data, list):
+        for item in data:
+            for value in _find(item, rest):
+                yield value
+    elif isinstance(data, dict) and part in data:
+        for value in _find(data[part], rest):
+            yield value
+
+
+def iter_collection(fileobj, path):
+    """
+    Yield the items of a collection in a JSON document as they are parsed.
+
+    The collection is either one of the count-wrapped objects used by the API:
+
+    .. code-block:: json
+
+        {
+            'count': 2,
+            '0': { obj1 },
+            '1': { obj2 },
+        }
+
+    or a plain list. Only a single item is held in memory at a time.
+
+    Parameters:
+        ``fileobj``:
+            A file-like object with the JSON document.
+        ``path`` (:class:`str`):
+            The location of the collection, in ijson's dotted notation where
+            ``item`` stands for any list element, e.g.
+            ``'fantasy_content.league.item.players'``.
+
+    Numbers are decoded as by :func:`loads`, i.e. as :class:`int` or
+    :class:`float` rather than ijson's :class:`~decimal.Decimal`. If ijson
+    isn't installed, the whole document is decoded first.
+    """
+    if ijson is None:
+        for collection in _find(loads(fileobj.read()), path.split('.')):
+            for item in _iter_wrapped(collection):
+                yield item
+        return
+
+    builder = None
+    depth = 0
+    for prefix, event, value in ijson.parse(fileobj):
+        # ijson 3 can do this itself (use_float=True), but ijson 2 can't.
+        if event == 'number' and isinstance(value, Decimal):
+            value = float(value)
+
+        if builder is not None:
+            builder.event(event, value)
+            if event in ('start_map', 'start_array'):
+                depth += 1
+            elif event in ('end_map', 'end_array'):
+                depth -= 1
+            if depth == 0:
+                yield builder.value
+                builder = None
+
+        # The start of an item in a count-wrapped object.
+        elif prefix == path and event == 'map_key' and value != 'count':
+            builder = ObjectBuilder()
+
+        # An item in a list.
+        elif prefix == path + '.item':
+            if event in ('start_map', 'start_array'):
+                builder = ObjectBuilder()
+                builder.event(event, value)
+                depth = 1
+            else:
+                yield value
@@ -0,0 +1,216 @@
+"""
+Per-request instrumentation of a :class:`~YHandler.base.YahooFantasySports`
+handler, see :meth:`~YHandler.base.YahooFantasySports.add_hook`.
+"""
+from __future__ import absolute_import
+
+from collections import defaultdict, deque
+import re
+import threading
+import time
+
+# Resources whose key follows them in a query string, e.g. league/371.l.1234.
+_KEYED_RESOURCE_RE = re.compile(r'\b(game|league|team|player|transaction)/[^/;]+')
+_PARAMETER_RE = re.compile(r'=[^;/]*')
+
+
+def query_pattern(querystring):
+    """
+    Group query strings by replacing keys and parameter values with ``{}``, e.g.
+    ``'league/371.l.1234/players;start=25'`` becomes
+    ``'league/{}/players;start={}'``.
+    """
+    return _PARAMETER_RE.sub('={}', _KEYED_RESOURCE_RE.sub(r'\1/{}', querystring))
+
+
+class RequestEvent(object):
+    """
+    What happened during a single call to
+    :meth:`~YHandler.base.YahooFantasySports.api_req` (or
+    :meth:`~YHandler.base.YahooFantasySports.api_req_iter`).
+
+    **querystring**, **pattern**, **method**
+        The request, and its :func:`query_pattern`.
+
+    **status**
+        The :class:`int` status code of the final response, or :const:`None`
+        if no response was received (e.g. a cache hit).
+
+    **bytes**
+        The :class:`int` size of the (decoded) response body, or :const:`None`
+        if it isn't known.
+
+    **retries**
+        The :class:`int` number of times the request was re-sent after being
+        throttled.
+
+    **refreshed**
+        Whether the request was rejected and re-sent with a refreshed token.
+
+    **cache_hit**
+        Whether the result came from the cache, without a request.
+
+    **coalesced**
+        Whether the result came from an identical request which was already in
+        progress, without a request of its own.
+
+    **error**
+        The exception raised, or :const:`None`.
+
+    **timings**
+        A :class:`dict` of stage to seconds, for the stages which ran:
+
+        * ``'cache'``: looking up and storing the result in the cache.
+        * ``'coalesce'``: waiting for an identical request in progress.
+        * ``'wait'``: waiting for the rate limiter, including the pauses after
+          being throttled.
+        * ``'refresh'``: refreshing the access token.
+        * ``'sign'``: signing the request.
+        * ``'network'``: sending the request and reading the response body
+          (for :meth:`~YHandler.base.YahooFantasySports.api_req_iter`, only
+          reading the headers).
+        * ``'decode'``: decoding the JSON body.
+        * ``'total'``: the whole call.
+
+    """
+    def __init__(self, querystring, method):
+        self.querystring = querystring
+        self.pattern = query_pattern(querystring)
+        self.method = method
+        self.status = None
+        self.bytes = None
+        self.retries = 0
+        self.refreshed = False
+        self.cache_hit = False
+        self.coalesced = False
+        self.error = None
+        self.timings = {}
+        self.started = time.time()
+
+    def add_time(self, stage, seconds):
+        """Add to the time spent in a stage."""
+        self.timings[stage] = self.timings.get(stage, 0.0) + seconds
+
+    def timed(self, stage, func):
+        """:returns func wrapped to add the time spent calling it to a stage"""
+        def wrapper(*args, **kwargs):
+            start = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                self.add_time(stage, time.time() - start)
+        return wrapper
+
+    def finish(self):
+        self.timings['total'] = time.time() - self.started
+
+    def __repr__(self):
+        return '<RequestEvent {0} {1} status={2} {3:.1f}ms>'.format(
+            self.method, self.querystring, self.status,
+            self.timings.get('total', 0.0) * 1000)
+
+
+def _percentile(values, q):
+    """The q-th percentile (0-100) of sorted values, interpolating between them."""
+    if not values:
+        return None
+    position = (len(values) - 1) * q / 100.0
+    lower = int(position)
+    upper = min(lower + 1, len(values) - 1)
+    return values[lower] + (values[upper] - values[lower]) * (position - lower)
+
+
+class MetricsCollector(object):
+    """
+    A hook which keeps :class:`RequestEvent` objects in memory and summarizes
+    them, e.g.::
+
+        metrics = MetricsCollector()
+        handler.add_hook(metrics)
+        ...
+        metrics.percentile('network', 99, 'league/{}/players;start={}')
+
+    Parameters:
+        ``maxlen`` (:class:`int`):
+            Only keep the most recent events, by default all are kept.
+
+    """
+    def __init__(self, maxlen=None):
+        self.events = deque(maxlen=maxlen)
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    def clear(self):
+        with self._lock:
+            self.events.clear()
+
+    def _select(self, pattern=None):
+        with self._lock:
+            events = list(self.events)
+        if pattern is None:
+            return events
+        return [e for e in events if e.pattern == pattern]
+
+    def count(self, pattern=None):
+        """The number of events, optionally only of a query pattern."""
+        return len(self._select(pattern))
+
+    def percentile(self, stage, q, pattern=None):
+        """
+        Parameters:
+            ``stage`` (:class:`str`):
+                A timing stage (e.g. ``'network'`` or ``'total'``), or
+                ``'bytes'``.
+            ``q`` (:class:`float`):
+                The percentile, from 0 to 100.
+            ``pattern`` (:class:`str`):
+                Only consider events of this query pattern.
+
+        Returns:
+            The percentile in seconds (or bytes) of the events which have the
+            stage, or :const:`None` if there are none.
+
+        """
+        if stage == 'bytes':
+            values = [e.bytes for e in self._select(pattern) if e.bytes is not None]
+        else:
+            values = [e.timings[stage] for e in self._select(pattern) if stage in e.timings]
+        return _percentile(sorted(values), q)
+
+    def summary(self, percentiles=(50, 90, 99)):
+        """
+        Returns:
+            :class:`dict` of query pattern to a :class:`dict` with the
+            ``count``, ``errors``, ``cache_hits``, ``coalesced``, ``retries``
+            and ``refreshes`` of its events, the total ``bytes`` received, and for
+            each timing stage a :class:`dict` of percentile to seconds.
+
+        """
+        by_pattern = defaultdict(list)
+        for event in self._select():
+            by_pattern[event.pattern].append(event)
+
+        result = {}
+        for pattern, events in by_pattern.items():
+            stages = defaultdict(list)
+            for event in events:
+                for stage, seconds in event.timings.items():
+                    stages[stage].append(seconds)
+
+            summary = {
+                'count': len(events),
+                'errors': sum(1 for e in events if e.error is not None),
+                'cache_hits': sum(1 for e in events if e.cache_hit),
+                'coalesced': sum(1 for e in events if e.coalesced),
+                'retries': sum(e.retries for e in events),
+                'refreshes': sum(1 for e in events if e.refreshed),
+                'bytes': sum(e.bytes for e in events if e.bytes is not None),
+            }
+            for stage, values in stages.items():
+                values.sort()
+                summary[stage] = dict((q, _percentile(values, q)) for q in percentiles)
+            result[pattern] = summary
+        return result
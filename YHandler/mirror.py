@@ -0,0 +1,247 @@
+"""
+A local copy of a league in SQLite, kept up to date incrementally.
+"""
+from __future__ import absolute_import
+
+import json
+import sqlite3
+import time
+
+from YHandler.resources.base import YahooApiData
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS leagues (
+    league_key TEXT PRIMARY KEY,
+    data TEXT NOT NULL,
+    synced_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS teams (
+    team_key TEXT PRIMARY KEY,
+    league_key TEXT NOT NULL,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rosters (
+    team_key TEXT NOT NULL,
+    player_key TEXT NOT NULL,
+    selected_position TEXT,
+    PRIMARY KEY (team_key, player_key)
+);
+CREATE TABLE IF NOT EXISTS players (
+    player_key TEXT PRIMARY KEY,
+    name TEXT,
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS player_stats (
+    player_key TEXT NOT NULL,
+    coverage_type TEXT NOT NULL,
+    coverage TEXT NOT NULL,
+    stat_id INTEGER NOT NULL,
+    value REAL,
+    PRIMARY KEY (player_key, coverage_type, coverage, stat_id)
+);
+CREATE TABLE IF NOT EXISTS sync_state (
+    league_key TEXT NOT NULL,
+    name TEXT NOT NULL,
+    value TEXT,
+    PRIMARY KEY (league_key, name)
+);
+'''
+
+# The types of transaction which change rosters.
+TRANSACTION_TYPES = ('add', 'drop', 'trade')
+
+
+def _default(obj):
+    """Serialize resources (e.g. managers) by their data."""
+    if isinstance(obj, YahooApiData):
+        return obj._api_dict
+    raise TypeError(repr(obj))
+
+
+def _to_json(api_dict, exclude=()):
+    return json.dumps(dict((k, v) for k, v in api_dict.items() if k not in exclude),
+                      default=_default)
+
+
+def _stat_value(value):
+    """Stats are strings, with ``'-'`` (or an empty value) meaning no value."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+class LeagueMirror(object):
+    """
+    Persists a league's teams, rosters, players and player stats into a SQLite
+    database, and on later runs only fetches what changed.
+
+    The first :meth:`sync` fetches every roster and the season stats of every
+    rostered player. Later syncs read the league's transactions since the last
+    sync (usually a single request), then re-fetch only the rosters of the
+    teams involved and the stats of their players. The stats of players on
+    other teams are only refreshed when a new week of the game starts
+    (according to the game's ``game_weeks``), when every roster and stat line
+    is, or by a ``full`` sync.
+
+    Parameters:
+        ``league`` (:class:`~YHandler.resources.YahooLeagueResource`):
+            The league to mirror.
+        ``path`` (:class:`str`):
+            The SQLite database file, several leagues may share one.
+
+    """
+    def __init__(self, league, path):
+        self.league = league
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.executescript(SCHEMA)
+        self._game = None
+
+    def close(self):
+        self._conn.close()
+
+    @property
+    def league_key(self):
+        return self.league.league_key
+
+    def _get_state(self, name, default=None):
+        row = self._conn.execute(
+            'SELECT value FROM sync_state WHERE league_key = ? AND name = ?',
+            (self.league_key, name)).fetchone()
+        return row[0] if row else default
+
+    def _set_state(self, name, value):
+        self._conn.execute(
+            'INSERT OR REPLACE INTO sync_state (league_key, name, value) VALUES (?, ?, ?)',
+            (self.league_key, name, value))
+
+    def _current_week(self):
+        """The week of the game currently being played."""
+        if self._game is None:
+            self._game = self.league._get_game()
+        for week in self._game.game_weeks:
+            if week.is_current:
+                return str(week.week)
+        # Outside of the season, fall back to what the league reports.
+        return str(self.league._api_dict.get('current_week', ''))
+
+    def _store_teams(self, teams):
+        """Replace the given teams and their rosters, returns the rostered player keys."""
+        player_keys = set()
+        for team in teams:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO teams (team_key, league_key, name, data) VALUES (?, ?, ?, ?)',
+                (team.team_key, self.league_key, team._api_dict.get('name'),
+                 _to_json(team._api_dict, exclude=('roster',))))
+
+            self._conn.execute('DELETE FROM rosters WHERE team_key = ?', (team.team_key,))
+            selected_positions = team.roster.selected_positions
+            for player in team.roster.players:
+                selected_position = selected_positions.get(player.player_key, {})
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO rosters (team_key, player_key, selected_position) '
+                    'VALUES (?, ?, ?)',
+                    (team.team_key, player.player_key, selected_position.get('position')))
+                player_keys.add(player.player_key)
+        return player_keys
+
+    def _store_players(self, players):
+        for player in players:
+            name = player._api_dict.get('name', {})
+            self._conn.execute(
+                'INSERT OR REPLACE INTO players (player_key, name, data) VALUES (?, ?, ?)',
+                (player.player_key, name.get('full'),
+                 _to_json(player._api_dict, exclude=('player_stats', 'coverage_stats'))))
+
+            for (coverage_type, coverage), stats in player._api_dict.get('coverage_stats', {}).items():
+                self._conn.executemany(
+                    'INSERT OR REPLACE INTO player_stats '
+                    '(player_key, coverage_type, coverage, stat_id, value) VALUES (?, ?, ?, ?, ?)',
+                    [(player.player_key, coverage_type, coverage, int(s['stat_id']),
+                      _stat_value(s['value'])) for s in stats['stats']])
+
+    def sync(self, full=False):
+        """
+        Bring the mirror up to date.
+
+        Parameters:
+            ``full`` (:class:`bool`):
+                Re-fetch everything, even if the mirror looks current.
+
+        Returns:
+            :class:`dict` with ``full`` (whether everything was re-fetched),
+            ``teams`` (the team keys re-fetched) and ``players`` (the player
+            keys whose stats were fetched).
+
+        """
+        week = self._current_week()
+        synced_week = self._get_state('week')
+        since = self._get_state('transaction_timestamp')
+        # Mirrors synced before the keys were stored have none, meaning every
+        # transaction at the timestamp was seen.
+        keys = json.loads(self._get_state('transaction_keys', 'null'))
+
+        full = full or synced_week is None or since is None or week != synced_week
+        if full:
+            poller = self.league.poll_transactions(TRANSACTION_TYPES, page_size=25)
+            poller.prime()
+            teams = self.league.get_rosters()
+        else:
+            cursor = (int(since), frozenset(keys) if keys is not None else None)
+            poller = self.league.poll_transactions(
+                TRANSACTION_TYPES, page_size=25, cursor=cursor)
+            team_keys = set()
+            for transaction in poller.poll():
+                team_keys.update(transaction.team_keys)
+            teams = self.league.get_rosters(sorted(team_keys)) if team_keys else []
+
+        with self._conn:
+            player_keys = self._store_teams(teams)
+
+            players = []
+            if player_keys:
+                players = self.league.get_players_by_key(sorted(player_keys), out=('stats',))
+            self._store_players(players)
+
+            self._conn.execute(
+                'INSERT OR REPLACE INTO leagues (league_key, data, synced_at) VALUES (?, ?, ?)',
+                (self.league_key, _to_json(self.league._api_dict), time.time()))
+            self._set_state('week', week)
+            since, keys = poller.cursor
+            self._set_state('transaction_timestamp', str(since))
+            self._set_state('transaction_keys',
+                            json.dumps(sorted(keys) if keys is not None else None))
+
+        return {
+            'full': full,
+            'teams': [t.team_key for t in teams],
+            'players': sorted(player_keys),
+        }
+
+    def teams(self):
+        """:returns list of the stored team dicts"""
+        return [json.loads(row[0]) for row in self._conn.execute(
+            'SELECT data FROM teams WHERE league_key = ? ORDER BY team_key', (self.league_key,))]
+
+    def roster(self, team_key):
+        """:returns list of (player_key, selected_position) for a stored team"""
+        return [tuple(row) for row in self._conn.execute(
+            'SELECT player_key, selected_position FROM rosters WHERE team_key = ? '
+            'ORDER BY player_key', (team_key,))]
+
+    def player(self, player_key):
+        """:returns the stored player dict, or None"""
+        row = self._conn.execute(
+            'SELECT data FROM players WHERE player_key = ?', (player_key,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def player_stats(self, player_key, coverage_type='season', coverage=None):
+        """:returns dict of stat ID to value for a stored player"""
+        query = 'SELECT stat_id, value FROM player_stats WHERE player_key = ? AND coverage_type = ?'
+        params = [player_key, coverage_type]
+        if coverage is not None:
+            query += ' AND coverage = ?'
+            params.append(str(coverage))
+        return dict(self._conn.execute(query, params).fetchall())
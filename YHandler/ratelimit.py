@@ -0,0 +1,105 @@
+from __future__ import absolute_import
+
+from email.utils import mktime_tz, parsedate_tz
+import random
+import threading
+import time
+
+# Yahoo responds with 999 (and sometimes 429) when it is throttling a client.
+THROTTLE_STATUS_CODES = (429, 999)
+
+
+def _parse_retry_after(value):
+    """
+    Parse a Retry-After header, which is either a number of seconds or an HTTP
+    date.
+    :returns number of seconds to wait, or None if it can't be parsed
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+
+    parsed = parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, mktime_tz(parsed) - time.time())
+
+
+class RateLimiter(object):
+    """
+    A thread-safe token bucket which limits how quickly requests are sent, and
+    backs off when the server signals that it is throttling.
+
+    A single instance is owned by a :class:`~YHandler.base.YahooFantasySports`
+    handler and shared by every thread using it. After a throttled response
+    all callers pause, not only the one which received it.
+
+    Parameters:
+        ``rate`` (:class:`float`):
+            The sustained number of requests per second, greater than zero.
+        ``burst`` (:class:`int`):
+            The number of requests which may be sent at once after being idle,
+            defaults to ``rate``.
+        ``max_retries`` (:class:`int`):
+            How many times a throttled request is retried before giving up.
+        ``backoff_base`` (:class:`float`):
+            The delay, in seconds, before the first retry. It doubles for each
+            subsequent retry.
+        ``backoff_max`` (:class:`float`):
+            The longest delay, in seconds, between retries, even if the server
+            asks for a longer one.
+
+    """
+    def __init__(self, rate=10.0, burst=None, max_retries=5, backoff_base=1.0, backoff_max=60.0):
+        if rate <= 0:
+            raise ValueError("rate must be positive: %s" % rate)
+        self.rate = float(rate)
+        self.capacity = float(burst or max(1.0, rate))
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+
+        self._lock = threading.Lock()
+        self._tokens = self.capacity
+        self._updated = time.time()
+        self._blocked_until = 0.0
+
+    def acquire(self):
+        """Block until a request may be sent."""
+        while True:
+            with self._lock:
+                now = time.time()
+                wait = self._blocked_until - now
+                if wait <= 0:
+                    self._tokens = min(self.capacity,
+                                       self._tokens + (now - self._updated) * self.rate)
+                    self._updated = now
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return
+                    wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+    def backoff(self, attempt, retry_after=None):
+        """
+        Pause all requests after a throttled response.
+        :param: attempt - the number of retries already made for this request
+        :param: retry_after - the value of the Retry-After header, if any
+        :returns number of seconds requests are paused for
+        """
+        delay = _parse_retry_after(retry_after)
+        if delay is None:
+            # Exponential backoff with "full jitter".
+            delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        else:
+            # Don't let a bogus header (e.g. a date far in the future) stall every request.
+            delay = min(delay, self.backoff_max)
+
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.time() + delay)
+            # Don't let a burst through once the pause is over.
+            self._tokens = 0.0
+        return delay
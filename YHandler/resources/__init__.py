@@ -1,6 +1,12 @@
+from YHandler.resources.base import ResourceContext, set_default_handler
 from YHandler.resources.game import YahooGameResource
 from YHandler.resources.league import (YahooLeagueResource,
                                        YahooManagerResource,
                                        YahooPlayerResource,
                                        YahooRosterResource,
                                        YahooTeamResource)
+from YHandler.resources.transaction import (YahooAddDropTransaction,
+                                            YahooTradeTransaction,
+                                            YahooTransactionPoller,
+                                            YahooTransactionResource)
+from YHandler.resources.compact import CompactPlayer, CompactRoster, CompactTeam
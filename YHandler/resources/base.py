@@ -1,3 +1,62 @@
+from collections import Mapping, Sequence
+from itertools import imap, islice
+from operator import itemgetter
+
+# The handler unpickled resources are bound to, see set_default_handler().
+_default_handler = None
+
+
+def set_default_handler(handler):
+    """
+    Set the handler which resources are bound to when unpickled, e.g. in the
+    initializer of each worker process. Pickled resources never include their
+    handler (or its credentials).
+
+    Parameters:
+        ``handler`` (:class:`~YHandler.base.YahooFantasySports`):
+            The handler, or :const:`None` to leave unpickled resources unbound
+            until :meth:`BaseYahooResource.rebind` is called.
+
+    """
+    global _default_handler
+    _default_handler = handler
+
+
+def _restore(cls, api_dict):
+    """Re-create a pickled YahooApiData, without calling its constructor."""
+    obj = cls.__new__(cls)
+    obj._api_dict = api_dict
+    return obj
+
+
+def _restore_context(game_key, league_key):
+    return ResourceContext(_default_handler, game_key, league_key)
+
+
+# The keys of count-wrapped arrays, so they aren't formatted for every item.
+_INDEX_KEYS = [str(i) for i in range(64)]
+
+
+def _index_keys(count):
+    """:returns a list of at least the first count index keys, '0', '1', ..."""
+    global _INDEX_KEYS
+    keys = _INDEX_KEYS
+    if len(keys) < count:
+        # Replaced rather than extended, so other threads never see a partial list.
+        keys = _INDEX_KEYS = [str(i) for i in range(max(count, 2 * len(keys)))]
+    return keys
+
+
+def _chunked(iterable, size):
+    """Yield successive lists of at most ``size`` items from ``iterable``."""
+    iterator = iter(iterable)
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
 class YahooApiData(object):
     """Provides the results of an API request as properties on an object."""
     def __init__(self, api_dict):
@@ -5,11 +64,20 @@ class YahooApiData(object):
 
     def __getattr__(self, attribute):
         """Proxy access to stored attributes."""
-        if attribute not in self._api_dict:
+        # API fields never start with an underscore, this also avoids recursing
+        # before _api_dict is set.
+        if attribute.startswith('_') or attribute not in self._api_dict:
             raise AttributeError(attribute)
         return self._api_dict[attribute]
 
-    def _unwrap_array(self, data):
+    def __reduce__(self):
+        """Pickle the data, along with any other attributes (e.g. the context)."""
+        state = dict(self.__dict__)
+        api_dict = state.pop('_api_dict')
+        return (_restore, (type(self), api_dict), state or None)
+
+    @staticmethod
+    def _unwrap_array(data):
         """
         Unwrap the arrays that are wrapped into an object that the Yahoo Fantasy
         API returns. The data will look something like:
@@ -29,9 +97,11 @@ class YahooApiData(object):
             [obj1, obj2]
 
         """
-        return [data[str(i)] for i in range(data['count'])]
+        count = data['count']
+        return map(data.__getitem__, _index_keys(count)[:count])
 
-    def _flatten_array(self, data, key):
+    @staticmethod
+    def _flatten_array(data, key):
         """
         Flatten an array that has keys that are all identical, e.g.:
 
@@ -51,7 +121,8 @@ class YahooApiData(object):
         """
         return [item[key] for item in data]
 
-    def _unwrap_dict(self, data):
+    @staticmethod
+    def _unwrap_dict(data, result=None):
         """
         Unwrap the dict that is given in array that the Yahoo Fantasy API
         returns. The data will look something like:
@@ -73,39 +144,234 @@ class YahooApiData(object):
                 'key2': obj2,
             }
 
+        If ``result`` is given, the items are added to it (and it is returned)
+        instead of to a new dict.
+
         """
-        result = {}
+        if result is None:
+            result = {}
         for item in data:
             # Some data ends with an empty list, just ignore it.
-            if item == []:
-                continue
-
-            for key, value in item.iteritems():
-                # TODO Ensure we're not overwriting key.
-                result[key] = value
+            # TODO Ensure we're not overwriting key.
+            if item:
+                result.update(item)
 
         return result
 
 
+class ArrayView(Sequence):
+    """
+    A read-only sequence over an array as returned by the API, without copying
+    it. The array is either wrapped into an object (see
+    :meth:`YahooApiData._unwrap_array`) or a plain list.
+
+    Parameters:
+        ``data`` (:class:`dict` or :class:`list`):
+            The array.
+        ``key`` (:class:`str`):
+            If given, each item is the value of this key of the element, as for
+            :meth:`YahooApiData._flatten_array`.
+
+    """
+    __slots__ = ('_data', '_key', '_len')
+
+    def __init__(self, data, key=None):
+        self._data = data
+        self._key = key
+        self._len = data['count'] if isinstance(data, dict) else len(data)
+
+    def __len__(self):
+        return self._len
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in xrange(*index.indices(self._len))]
+
+        if index < 0:
+            index += self._len
+        if not 0 <= index < self._len:
+            raise IndexError(index)
+
+        if isinstance(self._data, dict):
+            item = self._data[str(index)]
+        else:
+            item = self._data[index]
+        return item if self._key is None else item[self._key]
+
+    def __iter__(self):
+        if isinstance(self._data, dict):
+            items = imap(self._data.__getitem__, islice(_index_keys(self._len), self._len))
+        else:
+            items = iter(self._data)
+        if self._key is None:
+            return items
+        return imap(itemgetter(self._key), items)
+
+
+class DictView(Mapping):
+    """
+    A read-only mapping over a list of objects as returned by the API (see
+    :meth:`YahooApiData._unwrap_dict`), without merging them. A key appearing
+    more than once has its last value. Lookups search the list, which is
+    usually short.
+    """
+    __slots__ = ('_data',)
+
+    def __init__(self, data):
+        self._data = data
+
+    def __getitem__(self, key):
+        for item in reversed(self._data):
+            if item and key in item:
+                return item[key]
+        raise KeyError(key)
+
+    def iteritems(self):
+        """Iterate over the (key, value) pairs, in order, including repeated keys."""
+        for item in self._data:
+            if item:
+                for pair in item.iteritems():
+                    yield pair
+
+    def __iter__(self):
+        seen = set()
+        for key, _ in self.iteritems():
+            if key not in seen:
+                seen.add(key)
+                yield key
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+
+class ResourceContext(object):
+    """
+    What a resource needs from where it was fetched: the handler to make
+    requests with, and the keys of the game and league it belongs to. Resources
+    share the context of the resource they were fetched from, unless they
+    belong to a different game or league.
+
+    **handler**
+        The :class:`~YHandler.base.YahooFantasySports`, or :const:`None` if the
+        resource isn't bound to one.
+
+    **game_key**, **league_key**
+        :class:`str`, or :const:`None` if not known.
+
+    """
+    __slots__ = ('handler', 'game_key', 'league_key')
+
+    def __init__(self, handler=None, game_key=None, league_key=None):
+        self.handler = handler
+        self.game_key = game_key
+        self.league_key = league_key
+
+    def child(self, game_key=None, league_key=None):
+        """:returns the context for a resource within this one"""
+        # The league key is of the form {game_key}.l.{league_id}.
+        if league_key and not game_key:
+            game_key = league_key.split('.l.')[0]
+        game_key = game_key or self.game_key
+        league_key = league_key or self.league_key
+        if game_key == self.game_key and league_key == self.league_key:
+            return self
+        return ResourceContext(self.handler, game_key, league_key)
+
+    def rebind(self, handler):
+        """:returns a copy of this context using a different handler"""
+        return ResourceContext(handler, self.game_key, self.league_key)
+
+    def __reduce__(self):
+        # Never pickle the handler, unpickled contexts use the default one.
+        return (_restore_context, (self.game_key, self.league_key))
+
+    def __copy__(self):
+        # Copies of resources share the context, and keep their handler.
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+
+def _rebind(value, handler, contexts, seen):
+    """Rebind the resources in value, re-using a new context per old context."""
+    if isinstance(value, YahooApiData):
+        if id(value) in seen:
+            return
+        seen.add(id(value))
+
+        if isinstance(value, BaseYahooResource):
+            context = value._context
+            if id(context) not in contexts:
+                contexts[id(context)] = context.rebind(handler)
+            value._context = contexts[id(context)]
+        value = value._api_dict
+
+    if isinstance(value, dict):
+        for item in value.values():
+            _rebind(item, handler, contexts, seen)
+    elif isinstance(value, list):
+        for item in value:
+            _rebind(item, handler, contexts, seen)
+
+
 class BaseYahooResource(YahooApiData):
     """
     A "Resource" on the Yahoo Fantasy Sports API. This has data associated with
     it and represents a queryable endpoint.
 
+    The ``parent`` is the handler or resource this was fetched from, only its
+    :class:`ResourceContext` is kept.
+
+    Resources can be pickled, e.g. to send them to other processes or to store
+    them. Only their data is kept, once unpickled they're bound to the handler
+    given to :func:`set_default_handler`.
+
     """
+    # The key identifying a resource of this type, e.g. ``'player_key'``, for
+    # the handler's identity map.
+    _identity = None
+
     def __init__(self, api_dict, parent):
         super(BaseYahooResource, self).__init__(api_dict)
-        self._parent = parent
+        context = getattr(parent, '_context', None) or ResourceContext()
+        self._context = context.child(api_dict.get('game_key'), api_dict.get('league_key'))
+
+    def _canonical(self):
+        """
+        Returns the resource with the same key already known to the handler,
+        updated with the data of this one, so each player (or team) is a single
+        object within a league however it's fetched. If there is none, this
+        resource becomes the known one.
+        """
+        key = self._api_dict.get(self._identity) if self._identity else None
+        if key is None or self._context.handler is None:
+            return self
+        # A player has the same key in every league of a game, but its
+        # ownership differs, so resources are only shared within a league.
+        return self._context.handler._canonical(self, (self._context.league_key, key))
+
+    def _merge(self, other):
+        """Update with the data of a newer copy of this resource."""
+        self._api_dict.update(other._api_dict)
 
     @property
     def _api(self):
-        """Recurse via parents until you find a YHandler instance."""
-        # Avoid a recursive import.
-        from YHandler.base import YahooFantasySports
-
-        # TODO Better error handling.
-        parent = self._parent
-        while True:
-            if isinstance(parent, YahooFantasySports):
-                return parent
-            parent = parent._parent
+        """The YahooFantasySports handler to make requests with."""
+        handler = self._context.handler
+        if handler is None:
+            raise RuntimeError('{0} is not bound to a handler, see rebind()'.format(
+                type(self).__name__))
+        return handler
+
+    def rebind(self, handler):
+        """
+        Make requests from this resource, and every resource within it (e.g.
+        the players of a roster), with a different handler, e.g. one in
+        another process.
+
+        Parameters:
+            ``handler`` (:class:`~YHandler.base.YahooFantasySports`)
+
+        """
+        _rebind(self, handler, {}, set())
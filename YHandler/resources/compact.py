@@ -0,0 +1,235 @@
+"""
+Compact, read-only representations of players, rosters and teams.
+
+The resource classes keep the whole (merged) API response in a dictionary and
+serve attributes through ``__getattr__``, which is convenient but costs a
+dictionary per object (plus one per nested value) and a method call per
+attribute access. The classes here use ``__slots__``, keep only the commonly
+used fields, and store stats as a float array, which makes them suitable for
+holding many leagues' worth of players in memory.
+"""
+from array import array
+
+from YHandler.resources.base import YahooApiData
+
+# Tuples of stat IDs, shared by every player with the same stat ordering.
+_STAT_IDS = {}
+
+
+def _stat_value(value):
+    """Stats are strings, with ``'-'`` (or an empty value) meaning no value."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+class _Compact(object):
+    """
+    Pickles the slots, which only pickle protocol 2 and later do by default.
+    """
+    __slots__ = ()
+
+    def __getstate__(self):
+        return tuple(getattr(self, name, None) for name in self.__slots__)
+
+    def __setstate__(self, state):
+        for name, value in zip(self.__slots__, state):
+            setattr(self, name, value)
+
+
+class CompactPlayer(_Compact):
+    """
+    A slotted snapshot of a :class:`~YHandler.resources.YahooPlayerResource`.
+
+    **player_key**, **player_id**, **name** (the full name),
+    **team_abbr**, **display_position**, **position_type**, **status**
+        :class:`str` (or :const:`None` if not available).
+
+    **eligible_positions**
+        A :class:`tuple` of :class:`str`.
+
+    **selected_position**
+        The :class:`str` position when part of a roster, otherwise :const:`None`.
+
+    **is_undroppable**
+        A :class:`bool`.
+
+    **stat_ids**, **stat_values**
+        A :class:`tuple` of :class:`int` stat IDs and an :class:`array.array`
+        of the corresponding :class:`float` values (``nan`` for no value), if
+        the player's stats were fetched.
+
+    """
+    __slots__ = ('player_key', 'player_id', 'name', 'team_abbr', 'display_position',
+                 'position_type', 'status', 'eligible_positions', 'selected_position',
+                 'is_undroppable', 'stat_ids', 'stat_values')
+
+    def __init__(self, player_key, player_id=None, name=None, team_abbr=None,
+                 display_position=None, position_type=None, status=None,
+                 eligible_positions=(), selected_position=None, is_undroppable=False,
+                 stats=()):
+        self.player_key = player_key
+        self.player_id = player_id
+        self.name = name
+        self.team_abbr = team_abbr
+        self.display_position = display_position
+        self.position_type = position_type
+        self.status = status
+        self.eligible_positions = tuple(eligible_positions)
+        self.selected_position = selected_position
+        self.is_undroppable = is_undroppable
+
+        stat_ids = tuple(int(s['stat_id']) for s in stats)
+        self.stat_ids = _STAT_IDS.setdefault(stat_ids, stat_ids)
+        self.stat_values = array('d', [_stat_value(s['value']) for s in stats])
+
+    @classmethod
+    def _from_dict(cls, api_dict):
+        name = api_dict.get('name')
+        if isinstance(name, dict):
+            name = name.get('full')
+        selected_position = api_dict.get('selected_position')
+        if isinstance(selected_position, dict):
+            selected_position = selected_position.get('position')
+        player_stats = api_dict.get('player_stats')
+        stats = player_stats['stats'] if player_stats else ()
+
+        return cls(api_dict['player_key'],
+                   player_id=api_dict.get('player_id'),
+                   name=name,
+                   team_abbr=api_dict.get('editorial_team_abbr'),
+                   display_position=api_dict.get('display_position'),
+                   position_type=api_dict.get('position_type'),
+                   status=api_dict.get('status'),
+                   eligible_positions=api_dict.get('eligible_positions', ()),
+                   selected_position=selected_position,
+                   is_undroppable=bool(int(api_dict.get('is_undroppable') or 0)),
+                   stats=stats)
+
+    @classmethod
+    def from_resource(cls, player):
+        """Build from a :class:`~YHandler.resources.YahooPlayerResource`."""
+        return cls._from_dict(player._api_dict)
+
+    @classmethod
+    def from_api(cls, api_list):
+        """
+        Build directly from the ``player`` list of an API response, without
+        creating a :class:`~YHandler.resources.YahooPlayerResource`.
+        """
+        api_dict = {}
+        for item in api_list:
+            if isinstance(item, list):
+                YahooApiData._unwrap_dict(item, api_dict)
+            elif isinstance(item, dict):
+                api_dict.update(item)
+
+        api_dict['eligible_positions'] = YahooApiData._flatten_array(
+            api_dict.get('eligible_positions', []), 'position')
+        if isinstance(api_dict.get('selected_position'), list):
+            api_dict['selected_position'] = YahooApiData._unwrap_dict(
+                api_dict['selected_position'])
+        if 'player_stats' in api_dict:
+            api_dict['player_stats'] = {
+                'stats': [s['stat'] for s in api_dict['player_stats']['stats']]}
+
+        return cls._from_dict(api_dict)
+
+    def __setstate__(self, state):
+        super(CompactPlayer, self).__setstate__(state)
+        # Unpickled players share their stat IDs again.
+        self.stat_ids = _STAT_IDS.setdefault(self.stat_ids, self.stat_ids)
+
+    def stat(self, stat_id):
+        """The :class:`float` value of a stat, or ``nan`` if it isn't available."""
+        try:
+            return self.stat_values[self.stat_ids.index(stat_id)]
+        except ValueError:
+            return float('nan')
+
+    def __repr__(self):
+        return '<CompactPlayer {0} {1!r}>'.format(self.player_key, self.name)
+
+
+class CompactRoster(_Compact):
+    """
+    A slotted snapshot of a :class:`~YHandler.resources.YahooRosterResource`.
+
+    **coverage_type**
+        E.g. ``'week'`` or ``'date'``.
+
+    **coverage**
+        The week number or date the roster is for.
+
+    **players**
+        A :class:`tuple` of :class:`CompactPlayer`.
+
+    """
+    __slots__ = ('coverage_type', 'coverage', 'players')
+
+    def __init__(self, coverage_type, coverage, players):
+        self.coverage_type = coverage_type
+        self.coverage = coverage
+        self.players = tuple(players)
+
+    @classmethod
+    def from_resource(cls, roster):
+        """Build from a :class:`~YHandler.resources.YahooRosterResource`."""
+        api_dict = roster._api_dict
+        coverage_type = api_dict.get('coverage_type')
+        selected_positions = api_dict.get('selected_positions', {})
+        players = []
+        for resource in api_dict['players']:
+            player = CompactPlayer.from_resource(resource)
+            selected_position = selected_positions.get(player.player_key)
+            if selected_position is not None:
+                player.selected_position = selected_position.get('position')
+            players.append(player)
+        return cls(coverage_type, api_dict.get(coverage_type), players)
+
+    def __iter__(self):
+        return iter(self.players)
+
+    def __len__(self):
+        return len(self.players)
+
+
+class CompactTeam(_Compact):
+    """
+    A slotted snapshot of a :class:`~YHandler.resources.YahooTeamResource`.
+
+    **team_key**, **team_id**, **name**
+        :class:`str`.
+
+    **managers**
+        A :class:`tuple` of the managers' :class:`str` nicknames.
+
+    **roster**
+        A :class:`CompactRoster`, or :const:`None` if the roster wasn't fetched.
+
+    """
+    __slots__ = ('team_key', 'team_id', 'name', 'managers', 'roster')
+
+    def __init__(self, team_key, team_id=None, name=None, managers=(), roster=None):
+        self.team_key = team_key
+        self.team_id = team_id
+        self.name = name
+        self.managers = tuple(managers)
+        self.roster = roster
+
+    @classmethod
+    def from_resource(cls, team):
+        """Build from a :class:`~YHandler.resources.YahooTeamResource`."""
+        api_dict = team._api_dict
+        roster = api_dict.get('roster')
+        if roster is not None:
+            roster = CompactRoster.from_resource(roster)
+        return cls(api_dict['team_key'],
+                   team_id=api_dict.get('team_id'),
+                   name=api_dict.get('name'),
+                   managers=[m._api_dict.get('nickname') for m in api_dict.get('managers', [])],
+                   roster=roster)
+
+    def __repr__(self):
+        return '<CompactTeam {0} {1!r}>'.format(self.team_key, self.name)
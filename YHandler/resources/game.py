@@ -1,6 +1,7 @@
+from collections import OrderedDict
 from datetime import date, datetime
 
-from YHandler.resources.base import BaseYahooResource, YahooApiData
+from YHandler.resources.base import ArrayView, BaseYahooResource, YahooApiData
 from YHandler.resources.league import YahooLeagueResource
 
 
@@ -51,7 +52,7 @@ class YahooGameStat(YahooApiData):
     @property
     def sort_order(self):
         """:const:`True` if a larger value in this is better. :const:`False` if a smaller value is better."""
-        return bool(self._api_dict['sort_order'])
+        return bool(int(self._api_dict['sort_order']))
 
 
 class YahooGamePositionType(YahooApiData):
@@ -99,63 +100,80 @@ class YahooGameResource(BaseYahooResource):
     specific player or team game.
 
     """
+    _identity = 'game_key'
+
+    # The sub-resources which are fetched (together) on first access.
+    _METADATA = ('game_weeks', 'stat_categories', 'position_types', 'roster_positions')
+
     def __init__(self, *args, **kwargs):
         """
-        Constructor creates a YQuery object with a particular fantasy game context, and maps that
-        games stats into the stat_categories dictionary
-        :param: yhandler - YHandler object
-        :param: game_key - Yahoo fantasy API game key - these signify fantasy games, not sport games
-        :param: [optional, BaseSelector] selector - selector to use for the querying the xml
+        Constructor creates a resource with a particular fantasy game context.
+        The game's metadata (``game_weeks``, ``stat_categories``,
+        ``position_types`` and ``roster_positions``) is loaded in a single
+        request the first time any of it is accessed.
         """
         super(YahooGameResource, self).__init__(*args, **kwargs)
 
-        # Get additional metadata.
-        self.game_weeks = []
-        self._get_game_weeks()
+        self._metadata = None
 
-        self.stat_categories = {}
-        self._get_stat_categories()
+    def _get_metadata(self, name):
+        if self._metadata is None:
+            self._load_metadata()
+        return self._metadata[name]
 
-        self.position_types = {}
-        self._get_position_types()
+    def _load_metadata(self):
+        data = self._api.api_req(
+            'game/{0};out={1}'.format(self.game_key, ','.join(self._METADATA)))
 
-        self.roster_positions = {}
-        self._get_roster_positions()
+        # The first item is the game itself, each sub-resource follows it.
+        sub_resources = {}
+        for item in data['game'][1:]:
+            sub_resources.update(item)
 
-    def _get_game_weeks(self):
-        data = self._api.api_req('game/{0}/game_weeks'.format(self.game_key))
+        metadata = {}
 
         weeks = self._flatten_array(
-            self._unwrap_array(data['game'][1]['game_weeks']), 'game_week')
-        self.game_weeks = [YahooGameWeek(w) for w in weeks]
+            self._unwrap_array(sub_resources['game_weeks']), 'game_week')
+        metadata['game_weeks'] = [YahooGameWeek(w) for w in weeks]
 
-    def _get_stat_categories(self):
-        """
-        Maps a games stat categories to a Python dictionary. The mapping will be
-        held under the stat_categories data attribute.
+        # Maps a games stat categories to a Python dictionary, in the order the
+        # API lists them.
+        metadata['stat_categories'] = OrderedDict()
+        for stat in sub_resources['stat_categories']['stats']:
+            stat = YahooGameStat(stat['stat'])
+            metadata['stat_categories'][stat.stat_id] = stat
 
-        """
-        data = self._api.api_req('game/{0}/stat_categories'.format(self.game_key))
+        metadata['position_types'] = {}
+        for position_type in sub_resources['position_types']:
+            position_type = YahooGamePositionType(position_type['position_type'])
+            metadata['position_types'][position_type.type] = position_type
 
-        # Parse the results of the stats call.
-        stats = data['game'][1]['stat_categories']['stats']
-        for stat in stats:
-            stat = YahooGameStat(stat['stat'])
-            self.stat_categories[stat.stat_id] = stat
+        metadata['roster_positions'] = {}
+        for roster_position in sub_resources['roster_positions']:
+            roster_position = YahooGameRosterPosition(roster_position['roster_position'])
+            metadata['roster_positions'][roster_position.position] = roster_position
 
-    def _get_position_types(self):
-        data = self._api.api_req('game/{0}/position_types'.format(self.game_key))
+        self._metadata = metadata
 
-        for position_type in data['game'][1]['position_types']:
-            position_type = YahooGamePositionType(position_type['position_type'])
-            self.position_types[position_type.type] = position_type
+    @property
+    def game_weeks(self):
+        """A :class:`list` of :class:`YahooGameWeek`."""
+        return self._get_metadata('game_weeks')
+
+    @property
+    def stat_categories(self):
+        """An ordered :class:`dict` of stat ID to :class:`YahooGameStat`."""
+        return self._get_metadata('stat_categories')
 
-    def _get_roster_positions(self):
-        data = self._api.api_req('game/{0}/roster_positions'.format(self.game_key))
+    @property
+    def position_types(self):
+        """A :class:`dict` of type to :class:`YahooGamePositionType`."""
+        return self._get_metadata('position_types')
 
-        for roster_position in data['game'][1]['roster_positions']:
-            roster_position = YahooGameRosterPosition(roster_position['roster_position'])
-            self.roster_positions[roster_position.position] = roster_position
+    @property
+    def roster_positions(self):
+        """A :class:`dict` of position to :class:`YahooGameRosterPosition`."""
+        return self._get_metadata('roster_positions')
 
     def get_leagues(self, active_only=False):
         """
@@ -179,9 +197,9 @@ class YahooGameResource(BaseYahooResource):
 
         # This has multiple layers to parse through, generally: users, games,
         # leagues.
-        for user in self._unwrap_array(data['users']):
-            for game in self._unwrap_array(user['user'][1]['games']):
-                for league in self._unwrap_array(game['game'][1]['leagues']):
+        for user in ArrayView(data['users']):
+            for game in ArrayView(user['user'][1]['games']):
+                for league in ArrayView(game['game'][1]['leagues']):
                     league = YahooLeagueResource(league['league'][0], self)
 
                     # If the league is done, potentially skip it.
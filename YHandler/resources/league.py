@@ -1,6 +1,62 @@
+from multiprocessing.pool import ThreadPool
 from urllib import quote_plus
 
-from YHandler.resources.base import BaseYahooResource, YahooApiData
+from YHandler.resources.base import ArrayView, BaseYahooResource, YahooApiData, _chunked
+from YHandler.resources.transaction import YahooTransactionPoller, _make_transaction
+
+# The maximum number of player keys the API accepts in one players collection.
+MAX_PLAYER_KEYS = 25
+
+# The maximum number of players the API returns in one page of a players collection.
+PLAYERS_PAGE_SIZE = 25
+
+
+def _parse_player_stats(stats):
+    """Clean-up the player_stats sub-resource of a player."""
+    result = stats['0']
+    result['stats'] = [s['stat'] for s in stats['stats']]
+    return result
+
+
+def _stats_coverage(stats):
+    """The ``(coverage_type, coverage)`` of parsed player stats, e.g. ``('week', '3')``."""
+    coverage_type = stats.get('coverage_type', 'season')
+    return coverage_type, str(stats.get(coverage_type, ''))
+
+
+def _players_query(player_keys, out=(), week=None):
+    """
+    Build a players collection query for the given player keys, e.g.
+    ``players;player_keys=a,b;out=percent_owned/stats;type=week;week=3``.
+    """
+    query = 'players;player_keys={0}'.format(','.join(player_keys))
+
+    out = list(out)
+    stats = None
+    if week and 'stats' in out:
+        # Weekly stats need parameters, so can't be requested via out.
+        out.remove('stats')
+        stats = 'stats;type=week;week={0}'.format(week)
+    if out:
+        query += ';out=' + ','.join(out)
+    if stats:
+        query += '/' + stats
+
+    return query
+
+
+def _get_players_by_key(api_req, parent, player_keys, out, week, unwrap):
+    """
+    Fetch the players in chunks of MAX_PLAYER_KEYS, ``unwrap`` extracts the
+    players collection from each response.
+    """
+    players = []
+    for chunk in _chunked(player_keys, MAX_PLAYER_KEYS):
+        data = api_req(_players_query(chunk, out, week))
+        players.extend(
+            YahooPlayerResource(p['player'], parent)._canonical()
+            for p in ArrayView(unwrap(data)))
+    return players
 
 
 class YahooManagerResource(BaseYahooResource):
@@ -16,37 +72,78 @@ class YahooPlayerResource(BaseYahooResource):
 
     **elgible_positions**
     has_player_notes
-    selected_position
-        coverage_type
-        date
-        position
-    starting_status
-        coverage_type
-        date
-        is_starting
     is_undroppable
     position_type
     **headshot**
+    player_stats
+        The stats most recently fetched with the player.
+    coverage_stats
+        :class:`dict` of ``(coverage_type, coverage)``, e.g. ``('week', '3')``,
+        to each of the stats fetched with the player.
+
+    A player is shared by every roster in a league it's on (players fetched
+    from different leagues are different objects), so where it's placed is
+    kept by the roster.
+
+    .. note::
+
+        Players of a roster used to have ``selected_position`` and
+        ``starting_status``, these are now the roster's
+        :attr:`~YahooRosterResource.selected_positions` and
+        :attr:`~YahooRosterResource.starting_statuses`, by player key.
 
     """
 
+    # Which moved to the roster, see __getattr__.
+    _ROSTER_FIELDS = {'selected_position': 'selected_positions',
+                      'starting_status': 'starting_statuses'}
+
+    _identity = 'player_key'
+
     def __init__(self, api_dict, *args, **kwargs):
         # Convert the internal data.
         _api_dict = {}
         for item in api_dict:
             if isinstance(item, list):
-                _api_dict.update(self._unwrap_dict(api_dict[0]))
+                self._unwrap_dict(item, _api_dict)
             elif isinstance(item, dict):
                 _api_dict.update(item)
 
         # Now that the api_dict isn't as crazy, parse more data.
         _api_dict['eligible_positions'] = self._flatten_array(
             _api_dict['eligible_positions'], 'position')
-        _api_dict['selected_position'] = self._unwrap_dict(
-            _api_dict['selected_position'])
+        # Only available when the player is part of a roster.
+        if 'selected_position' in _api_dict:
+            _api_dict['selected_position'] = self._unwrap_dict(
+                _api_dict['selected_position'])
+
+        # Sub-resources which were requested along with the player.
+        if 'player_stats' in _api_dict:
+            stats = _api_dict['player_stats'] = _parse_player_stats(_api_dict['player_stats'])
+            _api_dict['coverage_stats'] = {_stats_coverage(stats): stats}
+        if isinstance(_api_dict.get('percent_owned'), list):
+            _api_dict['percent_owned'] = self._unwrap_dict(_api_dict['percent_owned'])
 
         super(YahooPlayerResource, self).__init__(_api_dict, *args, **kwargs)
 
+    def __getattr__(self, attribute):
+        try:
+            return super(YahooPlayerResource, self).__getattr__(attribute)
+        except AttributeError:
+            if attribute in self._ROSTER_FIELDS:
+                raise AttributeError(
+                    '{0} is no longer available on players, use the roster\'s {1}[player_key]'.format(
+                        attribute, self._ROSTER_FIELDS[attribute]))
+            raise
+
+    def _merge(self, other):
+        # Stats of other weeks (or seasons) are kept, not replaced.
+        coverage_stats = self._api_dict.get('coverage_stats', {})
+        coverage_stats.update(other._api_dict.get('coverage_stats', {}))
+        super(YahooPlayerResource, self)._merge(other)
+        if coverage_stats:
+            self._api_dict['coverage_stats'] = coverage_stats
+
     def api_req(self, sub_resouce, *args, **kwargs):
         """Request a sub-resource of a team."""
         return self._api.api_req(
@@ -59,11 +156,7 @@ class YahooPlayerResource(BaseYahooResource):
         data = self.api_req(resource)
 
         # No need to make a resource here, but clean-up the data.
-        stats = data['player'][1]['player_stats']
-        result = stats['0']
-        result['stats'] = [s['stat'] for s in stats['stats']]
-
-        return result
+        return _parse_player_stats(data['player'][1]['player_stats'])
 
     @property
     def has_player_notes(self):
@@ -95,22 +188,55 @@ class YahooPlayerResource(BaseYahooResource):
 
 
 class YahooRosterResource(BaseYahooResource):
-    def __init__(self, api_dict, *args, **kwargs):
-        # Convert the players to player resources.
-        api_dict['players'] = [
-            YahooPlayerResource(p['player'], self) for p in self._unwrap_array(api_dict.pop('0')['players'])]
+    """
+    The players on a team, at a date or week.
+
+    **players**
+    selected_positions
+        :class:`dict` of player key to where the player is placed, with the
+        ``coverage_type``, ``date`` (or ``week``) and ``position``.
+    starting_statuses
+        :class:`dict` of player key to whether the player is starting, with the
+        ``coverage_type``, ``date`` and ``is_starting``, for players which
+        have one.
 
+    """
+    def __init__(self, api_dict, *args, **kwargs):
         super(YahooRosterResource, self).__init__(api_dict, *args, **kwargs)
 
+        # Convert the players to player resources, after the parent is set so
+        # they can find the handler. Players are shared with other rosters
+        # (e.g. of other weeks), so their placement on this one is kept here.
+        players = []
+        selected_positions = {}
+        starting_statuses = {}
+        for p in ArrayView(api_dict.pop('0')['players']):
+            player = YahooPlayerResource(p['player'], self)
+            player_key = player.player_key
+            if 'selected_position' in player._api_dict:
+                selected_positions[player_key] = player._api_dict.pop('selected_position')
+            if 'starting_status' in player._api_dict:
+                starting_status = player._api_dict.pop('starting_status')
+                if isinstance(starting_status, list):
+                    starting_status = self._unwrap_dict(starting_status)
+                starting_statuses[player_key] = starting_status
+            players.append(player._canonical())
+
+        api_dict['players'] = players
+        api_dict['selected_positions'] = selected_positions
+        api_dict['starting_statuses'] = starting_statuses
+
 
 class YahooTeamResource(BaseYahooResource):
+    _identity = 'team_key'
+
     def __init__(self, api_dict, *args, **kwargs):
+        super(YahooTeamResource, self).__init__(api_dict, *args, **kwargs)
+
         # Convert the manager dict into YahooManagerResource objects.
         api_dict['managers'] = [
             YahooManagerResource(m['manager'], self) for m in api_dict['managers']]
 
-        super(YahooTeamResource, self).__init__(api_dict, *args, **kwargs)
-
     def api_req(self, sub_resouce, *args, **kwargs):
         """Request a sub-resource of a team."""
         return self._api.api_req(
@@ -160,6 +286,46 @@ class YahooLeagueStatCategory(YahooApiData):
 
         super(YahooLeagueStatCategory, self).__init__(api_dict)
 
+    @property
+    def is_only_display_stat(self):
+        """:const:`True` if this stat is shown, but not scored."""
+        return bool(int(self._api_dict.get('is_only_display_stat', 0)))
+
+    @property
+    def sort_order(self):
+        """:const:`True` if a larger value in this is better. :const:`False` if a smaller value is better."""
+        return bool(int(self._api_dict.get('sort_order', 1)))
+
+
+class YahooLeagueSnapshot(YahooApiData):
+    """
+    The state of a league, as returned by
+    :meth:`~YHandler.resources.YahooLeagueResource.snapshot`.
+
+    **league**
+        The :class:`~YHandler.resources.YahooLeagueResource`.
+
+    **teams**
+        A :class:`list` of :class:`~YHandler.resources.YahooTeamResource`, each
+        has its current ``roster`` as a
+        :class:`~YHandler.resources.YahooRosterResource`.
+
+    **standings**
+        A :class:`list` of :class:`~YHandler.resources.YahooTeamResource`, as
+        returned by :meth:`~YHandler.resources.YahooLeagueResource.get_standings`.
+
+    **scoreboard**
+        The current matchups, as returned by
+        :meth:`~YHandler.resources.YahooLeagueResource.scoreboard`.
+
+    """
+    def get_team(self, team_key):
+        """Get a team by key, or :const:`None` if it isn't in the league."""
+        for team in self.teams:
+            if team.team_key == team_key:
+                return team
+        return None
+
 
 class YahooLeagueResource(BaseYahooResource):
     """
@@ -183,20 +349,154 @@ class YahooLeagueResource(BaseYahooResource):
         return self._api.api_req(
             'league/{0}/{1}'.format(self.league_key, sub_resouce), *args, **kwargs)
 
+    def api_req_iter(self, sub_resouce, collection):
+        """
+        Request a sub-resource of a league and stream the items of one of its
+        collections, e.g. ``api_req_iter('players', 'players')``.
+        """
+        return self._api.api_req_iter(
+            'league/{0}/{1}'.format(self.league_key, sub_resouce),
+            'league.item.' + collection)
+
+    def api_req_self(self, parameters='', *args, **kwargs):
+        """Request the league itself, with optional parameters (e.g. ``;out=settings``)."""
+        return self._api.api_req(
+            'league/{0}{1}'.format(self.league_key, parameters), *args, **kwargs)
+
     def scoreboard(self):
         """The current matchups for all teams in the league."""
         data = self.api_req('scoreboard')
+        return self._parse_scoreboard(data['league'][1]['scoreboard'])
 
-        matchups = []
-        league = data['league'][1]['scoreboard']
-        return self._unwrap_array(league['matchups'])
+    def _parse_scoreboard(self, scoreboard):
+        return self._unwrap_array(scoreboard['matchups'])
 
     def get_players(self):
         data = self.api_req('players')
 
         players = data['league'][1]['players']
         return [
-            YahooPlayerResource(p['player'], self) for p in self._unwrap_array(players)]
+            YahooPlayerResource(p['player'], self)._canonical() for p in ArrayView(players)]
+
+    def _get_players_page(self, start, filters):
+        data = self.api_req('players;start={0};count={1}{2}'.format(
+            start, PLAYERS_PAGE_SIZE, filters))
+
+        # Past the last page the API returns an empty list.
+        players = data['league'][1]['players']
+        if not players:
+            return []
+        return [
+            YahooPlayerResource(p['player'], self)._canonical() for p in ArrayView(players)]
+
+    def iter_players(self, status=None, position=None, sort=None, prefetch=False):
+        """
+        Iterate over every player in the league, one page at a time.
+
+        Parameters:
+            ``status`` (:class:`str`):
+                Only include players with this status, e.g. ``'A'`` (all
+                available), ``'FA'``, ``'W'`` or ``'T'``.
+            ``position`` (:class:`str`):
+                Only include players eligible for this position, e.g. ``'C'``.
+            ``sort`` (:class:`str`):
+                The order to return players in, e.g. ``'OR'`` (overall rank),
+                ``'AR'`` or a stat ID.
+            ``prefetch`` (:class:`bool`):
+                If :const:`True`, the next page is requested in the background
+                while the current page is being consumed.
+
+        Returns:
+            A generator of :class:`~YHandler.resources.YahooPlayerResource`.
+            At most two pages of players are held in memory at a time.
+
+        """
+        filters = ''
+        for name, value in (('status', status), ('position', position), ('sort', sort)):
+            if value:
+                filters += ';{0}={1}'.format(name, value)
+
+        pool = ThreadPool(1) if prefetch else None
+        pending = None
+        start = 0
+        try:
+            page = self._get_players_page(start, filters)
+            while True:
+                # A short page is the last one.
+                more = len(page) == PLAYERS_PAGE_SIZE
+                start += PLAYERS_PAGE_SIZE
+                if more and pool is not None:
+                    pending = pool.apply_async(self._get_players_page, (start, filters))
+
+                for player in page:
+                    yield player
+
+                if not more:
+                    return
+                if pending is not None:
+                    page = pending.get()
+                else:
+                    page = self._get_players_page(start, filters)
+        finally:
+            if pool is not None:
+                pool.terminate()
+
+    def get_players_by_key(self, player_keys, out=('stats', 'ownership', 'percent_owned'), week=None):
+        """
+        Fetch many players, along with their sub-resources, in as few requests
+        as possible.
+
+        Parameters:
+            ``player_keys`` (iterable of :class:`str`):
+                The keys of the players to fetch, any number may be given.
+            ``out`` (iterable of :class:`str`):
+                The sub-resources to include for each player, any of
+                ``'stats'``, ``'ownership'`` and ``'percent_owned'``.
+            ``week`` (:class:`str`):
+                If given, stats are for this week instead of the season.
+
+        Returns:
+            :class:`list` of :class:`~YHandler.resources.YahooPlayerResource`:
+                The players, in the order given. The sub-resources are available
+                as the ``player_stats``, ``ownership`` and ``percent_owned``
+                attributes.
+
+        """
+        return _get_players_by_key(
+            self.api_req, self, player_keys, out, week,
+            lambda data: data['league'][1]['players'])
+
+    def _get_game(self):
+        """The game this league belongs to."""
+        # The game is usually still in use, e.g. the one this league came from.
+        game_key = self._context.game_key
+        game = self._api._identities.get((None, game_key))
+        if game is not None:
+            return game
+        return self._api.get_game(game_key)
+
+    def get_stats_matrix(self, player_keys, week=None):
+        """
+        Fetch the stats of many players as a matrix, for vectorized ranking
+        and scoring. Requires NumPy.
+
+        Parameters:
+            ``player_keys`` (iterable of :class:`str`):
+                The players to include, one row each.
+            ``week`` (:class:`str`):
+                If given, stats are for this week instead of the season.
+
+        Returns:
+            :class:`~YHandler.stats.YahooStatsMatrix`:
+                With a column per stat, in the order of the game's
+                ``stat_categories``.
+
+        """
+        # NumPy is optional, only import it when needed.
+        from YHandler.stats import YahooStatsMatrix
+
+        players = self.get_players_by_key(player_keys, out=('stats',), week=week)
+        return YahooStatsMatrix.from_players(players, self._get_game().stat_categories)
 
     def find_player(self, name):
         """
@@ -215,7 +515,7 @@ class YahooLeagueResource(BaseYahooResource):
 
         players = data['league'][1]['players']
         return [
-            YahooPlayerResource(p['player'], self) for p in self._unwrap_array(players)]
+            YahooPlayerResource(p['player'], self)._canonical() for p in ArrayView(players)]
 
     def get_teams(self):
         """
@@ -226,9 +526,9 @@ class YahooLeagueResource(BaseYahooResource):
         data = self.api_req('teams')
 
         teams = []
-        for team in self._unwrap_array(data['league'][1]['teams']):
+        for team in ArrayView(data['league'][1]['teams']):
             team = self._unwrap_dict(team['team'][0])
-            teams.append(YahooTeamResource(team, self))
+            teams.append(YahooTeamResource(team, self)._canonical())
         return teams
 
     def get_team(self):
@@ -241,7 +541,10 @@ class YahooLeagueResource(BaseYahooResource):
 
     def get_settings(self):
         data = self.api_req('settings')
-        settings = data['league'][1]['settings'][0]
+        self._parse_settings(data['league'][1]['settings'])
+
+    def _parse_settings(self, settings):
+        settings = settings[0]
 
         settings['roster_positions'] = [YahooLeagueRosterPosition(p) for p in
             self._flatten_array(settings['roster_positions'], 'roster_position')]
@@ -249,15 +552,149 @@ class YahooLeagueResource(BaseYahooResource):
         settings['stat_categories'] = [YahooLeagueStatCategory(c) for c in
             self._flatten_array(settings['stat_categories']['stats'], 'stat')]
 
+        # Only points leagues have modifiers, map the stat ID to its points.
+        if 'stat_modifiers' in settings:
+            settings['stat_modifiers'] = dict(
+                (int(m['stat_id']), float(m['value'])) for m in
+                self._flatten_array(settings['stat_modifiers']['stats'], 'stat'))
+        else:
+            settings['stat_modifiers'] = {}
+
         # TODO A lot of the settings are ints cast to string, parse those.
         self._api_dict.update(settings)
 
+    def get_scoring_engine(self):
+        """
+        Get an engine which computes fantasy points (or category results)
+        locally, using this league's stat categories and modifiers. The
+        settings are fetched if they haven't been already. Requires NumPy.
+
+        Returns:
+            :class:`~YHandler.scoring.FantasyPointsEngine`
+
+        """
+        # NumPy is optional, only import it when needed.
+        from YHandler.scoring import FantasyPointsEngine
+
+        if 'stat_categories' not in self._api_dict:
+            self.get_settings()
+        return FantasyPointsEngine.from_league(self)
+
     def get_standings(self):
+        """
+        Returns:
+            :class:`list` of :class:`~YHandler.resources.YahooTeamResource`:
+                The teams in the league, including their ``team_points`` and
+                ``team_standings``.
+
+        """
         data = self.api_req('standings')
-        teams = self._unwrap_array(data['league'][1]['standings'][0]['teams'])
-        for team in teams:
+        return self._parse_standings(data['league'][1]['standings'])
+
+    def _parse_standings(self, standings):
+        teams = []
+        for team in ArrayView(standings[0]['teams']):
             # The normal team data.
-            team = self._unwrap_dict(team['team'][0])
-            # Enrich this with the stats information.
-            team['team_stats'] = team['team'][1]['team_stats']
-            print(team)
+            api_dict = self._unwrap_dict(team['team'][0])
+            # Enrich this with the points and standings information.
+            for item in team['team'][1:]:
+                api_dict.update(item)
+            teams.append(YahooTeamResource(api_dict, self)._canonical())
+        return teams
+
+    def get_transactions(self, types=None, start=None, count=None):
+        """
+        Get the transactions of the league, newest first.
+
+        Parameters:
+            ``types`` (iterable of :class:`str`):
+                Only include these types, e.g. ``('add', 'drop', 'trade')``.
+            ``start`` (:class:`int`):
+                The number of (newest) transactions to skip.
+            ``count`` (:class:`int`):
+                The maximum number of transactions to return.
+
+        Returns:
+            :class:`list` of :class:`~YHandler.resources.YahooTransactionResource`:
+                :class:`~YHandler.resources.YahooAddDropTransaction` and
+                :class:`~YHandler.resources.YahooTradeTransaction` for those
+                types.
+
+        """
+        resource = 'transactions'
+        if types:
+            resource += ';types=' + ','.join(types)
+        if start:
+            resource += ';start={0}'.format(start)
+        if count:
+            resource += ';count={0}'.format(count)
+        data = self.api_req(resource)
+
+        # This is an empty list if there are no transactions.
+        transactions = data['league'][1]['transactions']
+        if not transactions:
+            return []
+        return [_make_transaction(t['transaction'], self)
+                for t in ArrayView(transactions)]
+
+    def poll_transactions(self, types=None, page_size=10, cursor=None):
+        """
+        Create a :class:`~YHandler.resources.YahooTransactionPoller` which
+        returns only new transactions each time it is polled.
+        """
+        return YahooTransactionPoller(self, types=types, page_size=page_size, cursor=cursor)
+
+    def get_rosters(self, team_keys=None):
+        """
+        Fetch the current roster of many teams in a single request.
+
+        Parameters:
+            ``team_keys`` (iterable of :class:`str`):
+                The teams to fetch, defaults to every team in the league.
+
+        Returns:
+            :class:`list` of :class:`~YHandler.resources.YahooTeamResource`:
+                Each has its current ``roster`` as a
+                :class:`~YHandler.resources.YahooRosterResource`.
+
+        """
+        resource = 'teams'
+        if team_keys is not None:
+            resource += ';team_keys=' + ','.join(team_keys)
+        data = self.api_req(resource + '/roster')
+
+        teams = []
+        for team in ArrayView(data['league'][1]['teams']):
+            roster = team['team'][1]['roster']
+            team = YahooTeamResource(self._unwrap_dict(team['team'][0]), self)._canonical()
+            team._api_dict['roster'] = YahooRosterResource(roster, team)
+            teams.append(team)
+        return teams
+
+    def snapshot(self):
+        """
+        Fetch the settings, standings, scoreboard and every team's roster in two
+        requests. The settings are also applied to this league, as
+        :meth:`get_settings` does.
+
+        Returns:
+            :class:`YahooLeagueSnapshot`
+
+        """
+        data = self.api_req_self(';out=settings,standings,scoreboard')
+
+        # The first item is the league itself, each sub-resource follows it.
+        sub_resources = {}
+        for item in data['league'][1:]:
+            sub_resources.update(item)
+
+        self._parse_settings(sub_resources['settings'])
+        standings = self._parse_standings(sub_resources['standings'])
+        scoreboard = self._parse_scoreboard(sub_resources['scoreboard'])
+
+        return YahooLeagueSnapshot({
+            'league': self,
+            'teams': self.get_rosters(),
+            'standings': standings,
+            'scoreboard': scoreboard,
+        })
@@ -0,0 +1,210 @@
+from YHandler.resources.base import ArrayView, BaseYahooResource, YahooApiData
+
+
+class YahooTransactionPlayer(YahooApiData):
+    """
+    A player moved by a transaction.
+
+    **player_key**, **name**, ...
+        The player's details, as for a
+        :class:`~YHandler.resources.YahooPlayerResource`.
+
+    **type**
+        The :class:`str` movement, e.g. ``'add'``, ``'drop'`` or ``'trade'``.
+
+    **source_type**, **destination_type**
+        Where the player came from and went, e.g. ``'team'``,
+        ``'freeagents'`` or ``'waivers'``.
+
+    **source_team_key**, **destination_team_key** (optional)
+        The teams involved, when the source or destination is a team.
+
+    """
+    def __init__(self, api_dict):
+        _api_dict = {}
+        for item in api_dict:
+            if isinstance(item, list):
+                self._unwrap_dict(item, _api_dict)
+            elif isinstance(item, dict):
+                _api_dict.update(item)
+
+        # This is a list with a single item for some transaction types.
+        transaction_data = _api_dict.pop('transaction_data', {})
+        if isinstance(transaction_data, list):
+            transaction_data = transaction_data[0]
+        _api_dict.update(transaction_data)
+
+        super(YahooTransactionPlayer, self).__init__(_api_dict)
+
+    @property
+    def source_team_key(self):
+        return self._api_dict.get('source_team_key', None)
+
+    @property
+    def destination_team_key(self):
+        return self._api_dict.get('destination_team_key', None)
+
+
+class YahooTransactionResource(BaseYahooResource):
+    """
+    A transaction in a league, e.g. a player being added or a trade.
+
+    **transaction_key**
+
+    **type**
+        E.g. ``'add'``, ``'drop'``, ``'add/drop'``, ``'trade'`` or
+        ``'commish'``.
+
+    **status**
+        E.g. ``'successful'``.
+
+    **players**
+        A :class:`list` of :class:`YahooTransactionPlayer`.
+
+    """
+    def __init__(self, api_dict, *args, **kwargs):
+        # The transaction details, followed by the players (if any).
+        _api_dict = dict(api_dict[0])
+        players = []
+        if len(api_dict) > 1 and api_dict[1].get('players'):
+            players = [YahooTransactionPlayer(p['player'])
+                       for p in ArrayView(api_dict[1]['players'])]
+        _api_dict['players'] = players
+
+        super(YahooTransactionResource, self).__init__(_api_dict, *args, **kwargs)
+
+    @property
+    def timestamp(self):
+        """The :class:`int` UNIX timestamp of when the transaction happened."""
+        return int(self._api_dict['timestamp'])
+
+    @property
+    def team_keys(self):
+        """The :class:`set` of the keys of the teams involved."""
+        keys = set()
+        for player in self.players:
+            keys.update(k for k in (player.source_team_key, player.destination_team_key) if k)
+        return keys
+
+
+class YahooAddDropTransaction(YahooTransactionResource):
+    """An ``'add'``, ``'drop'`` or ``'add/drop'`` transaction."""
+    @property
+    def added(self):
+        """The :class:`list` of :class:`YahooTransactionPlayer` added to a team."""
+        return [p for p in self.players if p.type == 'add']
+
+    @property
+    def dropped(self):
+        """The :class:`list` of :class:`YahooTransactionPlayer` dropped from a team."""
+        return [p for p in self.players if p.type == 'drop']
+
+
+class YahooTradeTransaction(YahooTransactionResource):
+    """A ``'trade'`` transaction, between ``trader_team_key`` and ``tradee_team_key``."""
+
+
+_TRANSACTION_TYPES = {
+    'add': YahooAddDropTransaction,
+    'drop': YahooAddDropTransaction,
+    'add/drop': YahooAddDropTransaction,
+    'trade': YahooTradeTransaction,
+}
+
+
+def _make_transaction(api_dict, parent):
+    """Create the resource class matching the type of the transaction."""
+    cls = _TRANSACTION_TYPES.get(api_dict[0].get('type'), YahooTransactionResource)
+    return cls(api_dict, parent)
+
+
+class YahooTransactionPoller(object):
+    """
+    Returns only the transactions of a league which haven't been seen before.
+
+    Each :meth:`poll` requests the newest ``page_size`` transactions, and only
+    requests more if every one of them is new. The position is kept in
+    :attr:`cursor`, which can be saved and passed back in to resume later.
+
+    Parameters:
+        ``league`` (:class:`~YHandler.resources.YahooLeagueResource`):
+            The league to poll.
+        ``types`` (iterable of :class:`str`):
+            Only return these transaction types, e.g. ``('add', 'trade')``.
+        ``page_size`` (:class:`int`):
+            The number of transactions to request at a time.
+        ``cursor`` (:class:`tuple`):
+            A ``(timestamp, transaction keys)`` pair from a previous poller.
+            Transactions older than the timestamp, or at the timestamp and in
+            the keys, have been seen. If the keys are :const:`None`, every
+            transaction at the timestamp has been seen. If not given, the first
+            poll only records the newest transactions.
+
+    """
+    def __init__(self, league, types=None, page_size=10, cursor=None):
+        self.league = league
+        self.types = types
+        self.page_size = page_size
+        self.cursor = cursor
+
+    def _is_new(self, transaction):
+        timestamp, keys = self.cursor
+        if transaction.timestamp != timestamp:
+            return transaction.timestamp > timestamp
+        return keys is not None and transaction.transaction_key not in keys
+
+    def prime(self):
+        """Mark every existing transaction as seen."""
+        # Transactions made later in the same second as the newest one are new,
+        # so the cursor needs the keys of every transaction at that second.
+        newest = 0
+        keys = set()
+        start = 0
+        while True:
+            transactions = self.league.get_transactions(
+                types=self.types, start=start, count=self.page_size)
+            if transactions and start == 0:
+                newest = transactions[0].timestamp
+            keys.update(t.transaction_key for t in transactions if t.timestamp == newest)
+            if len(transactions) < self.page_size or transactions[-1].timestamp != newest:
+                break
+            start += self.page_size
+
+        self.cursor = (newest, frozenset(keys))
+
+    def poll(self):
+        """
+        Returns:
+            :class:`list` of :class:`YahooTransactionResource`:
+                The transactions since the last poll, newest first.
+
+        """
+        if self.cursor is None:
+            self.prime()
+            return []
+
+        new = []
+        keys = set()
+        start = 0
+        while True:
+            transactions = self.league.get_transactions(
+                types=self.types, start=start, count=self.page_size)
+            # Transactions are returned newest first. Pages are by offset, so a
+            # transaction made while paging shifts the next page, repeating one.
+            page = [t for t in transactions
+                    if self._is_new(t) and t.transaction_key not in keys]
+            keys.update(t.transaction_key for t in page)
+            new.extend(page)
+            if (len(transactions) < self.page_size or
+                    not all(self._is_new(t) for t in transactions)):
+                break
+            start += self.page_size
+
+        if new:
+            newest = new[0].timestamp
+            keys = set(t.transaction_key for t in new if t.timestamp == newest)
+            if newest == self.cursor[0]:
+                keys.update(self.cursor[1])
+            self.cursor = (newest, frozenset(keys))
+
+        return new
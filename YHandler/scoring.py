@@ -0,0 +1,123 @@
+"""
+Local fantasy scoring from a league's settings, vectorized with NumPy so that
+thousands of player-weeks (or matchups) are scored at once.
+"""
+from __future__ import absolute_import
+
+import numpy
+
+# Scoring types, as given by a league's scoring_type.
+POINTS_SCORING_TYPES = ('point', 'headpoint')
+
+
+class FantasyPointsEngine(object):
+    """
+    Scores stat lines using a league's stat modifiers (points leagues) or
+    compares them category by category (head-to-head categories leagues).
+
+    Stat lines are 2-dimensional arrays with a row per player-week (or team)
+    and a column per stat ID, e.g. the ``values`` of a
+    :class:`~YHandler.stats.YahooStatsMatrix`. Missing (``nan``) values count
+    as zero points and don't win or lose a category.
+
+    Parameters:
+        ``stat_ids`` (:class:`list` of :class:`int`):
+            The scored stats, in the order of the columns.
+        ``modifiers`` (:class:`dict`):
+            Stat ID to the points awarded per unit of the stat.
+        ``sort_orders`` (:class:`dict`):
+            Stat ID to :const:`True` if higher is better, :const:`False` if
+            lower is better. Missing stats default to :const:`True`.
+        ``scoring_type`` (:class:`str`):
+            The league's scoring type, e.g. ``'head'`` or ``'headpoint'``.
+
+    """
+    def __init__(self, stat_ids, modifiers=None, sort_orders=None, scoring_type='headpoint'):
+        self.stat_ids = [int(s) for s in stat_ids]
+        self.modifiers = dict(modifiers or {})
+        self.sort_orders = dict(sort_orders or {})
+        self.scoring_type = scoring_type
+
+        self.weights = numpy.array([self.modifiers.get(s, 0.0) for s in self.stat_ids])
+        self.directions = numpy.array(
+            [1.0 if self.sort_orders.get(s, True) else -1.0 for s in self.stat_ids])
+
+    @classmethod
+    def from_league(cls, league):
+        """
+        Build from a :class:`~YHandler.resources.YahooLeagueResource` whose
+        settings have been fetched.
+        """
+        categories = [c for c in league.stat_categories if not c.is_only_display_stat]
+        return cls([c.stat_id for c in categories],
+                   modifiers=league.stat_modifiers,
+                   sort_orders=dict((int(c.stat_id), c.sort_order) for c in categories),
+                   scoring_type=league._api_dict.get('scoring_type', 'headpoint'))
+
+    @property
+    def is_points(self):
+        """:const:`True` if the league is scored by points, rather than categories."""
+        return self.scoring_type in POINTS_SCORING_TYPES or bool(self.modifiers)
+
+    def _align(self, values, stat_ids):
+        """Re-order the columns of values (given for stat_ids) to match this engine."""
+        values = numpy.atleast_2d(numpy.asarray(values, dtype=numpy.float64))
+        if stat_ids is None:
+            return values
+
+        columns = dict((int(s), i) for i, s in enumerate(stat_ids))
+        aligned = numpy.full((values.shape[0], len(self.stat_ids)), numpy.nan)
+        for i, stat_id in enumerate(self.stat_ids):
+            if stat_id in columns:
+                aligned[:, i] = values[:, columns[stat_id]]
+        return aligned
+
+    def points(self, values, stat_ids=None):
+        """
+        The fantasy points of each row.
+
+        Parameters:
+            ``values``:
+                A 2-dimensional array of stat lines.
+            ``stat_ids`` (:class:`list` of :class:`int`):
+                The stat ID of each column, if they aren't in the order of
+                :attr:`stat_ids`.
+
+        Returns:
+            A 1-dimensional :class:`numpy.ndarray` of points.
+
+        """
+        return numpy.nan_to_num(self._align(values, stat_ids)).dot(self.weights)
+
+    def points_for(self, matrix):
+        """
+        The fantasy points of each player in a
+        :class:`~YHandler.stats.YahooStatsMatrix`.
+
+        Returns:
+            :class:`dict` of player key to points.
+
+        """
+        return dict(zip(matrix.player_keys, self.points(matrix.values, matrix.stat_ids)))
+
+    def categories(self, values, opponent_values, stat_ids=None):
+        """
+        Compare stat lines category by category, row against row, as for
+        head-to-head categories matchups.
+
+        Returns:
+            A tuple of three 1-dimensional :class:`numpy.ndarray`, the number of
+            categories won, lost and tied by each row of ``values``.
+
+        """
+        values = self._align(values, stat_ids)
+        opponent_values = self._align(opponent_values, stat_ids)
+
+        # Positive means values is better, regardless of the sort order.
+        diff = (values - opponent_values) * self.directions
+        scored = ~numpy.isnan(diff)
+        with numpy.errstate(invalid='ignore'):
+            wins = ((diff > 0) & scored).sum(axis=1)
+            losses = ((diff < 0) & scored).sum(axis=1)
+        ties = (scored & (diff == 0)).sum(axis=1)
+        return wins, losses, ties
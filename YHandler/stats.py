@@ -0,0 +1,146 @@
+"""
+Columnar access to the stats of many players, for vectorized ranking and
+scoring. Requires NumPy, and pandas for :meth:`YahooStatsMatrix.to_dataframe`.
+"""
+from __future__ import absolute_import
+
+import numpy
+
+
+def _stat_value(value):
+    """Stats are strings, with ``'-'`` (or an empty value) meaning no value."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return numpy.nan
+
+
+class YahooStatsMatrix(object):
+    """
+    The stats of many players as a 2-dimensional array.
+
+    **player_keys**
+        A :class:`list` of :class:`str`, one per row.
+
+    **stat_ids**
+        A :class:`list` of :class:`int`, one per column.
+
+    **values**
+        A :class:`numpy.ndarray` of ``float64`` with a row per player and a
+        column per stat. Stats without a value are ``nan``.
+
+    **stat_categories**
+        The :class:`dict` of stat ID to
+        :class:`~YHandler.resources.game.YahooGameStat` used to build the
+        matrix, or :const:`None`.
+
+    """
+    def __init__(self, player_keys, stat_ids, values, stat_categories=None):
+        self.player_keys = list(player_keys)
+        self.stat_ids = list(stat_ids)
+        self.values = numpy.asarray(values, dtype=numpy.float64)
+        self.stat_categories = stat_categories
+        self._categories = dict((int(k), v) for k, v in (stat_categories or {}).items())
+
+        self._rows = dict((k, i) for i, k in enumerate(self.player_keys))
+        self._columns = dict((s, i) for i, s in enumerate(self.stat_ids))
+
+    @classmethod
+    def from_players(cls, players, stat_categories=None, coverage=None):
+        """
+        Build from players which have stats, either
+        :class:`~YHandler.resources.YahooPlayerResource` (fetched with their
+        ``stats`` sub-resource) or :class:`~YHandler.resources.CompactPlayer`.
+
+        Parameters:
+            ``players`` (iterable):
+                The players, one row each.
+            ``stat_categories`` (:class:`dict`):
+                The stat categories of the game, e.g.
+                :attr:`YahooGameResource.stat_categories <YHandler.resources.YahooGameResource.stat_categories>`.
+                The columns follow its order. If not given, the columns are the
+                stats found on the players, in the order they're first seen.
+            ``coverage`` (:class:`tuple`):
+                The ``(coverage_type, coverage)`` of the stats to use, e.g.
+                ``('week', '3')``, from each player's ``coverage_stats``. By
+                default the stats most recently fetched with each player are
+                used, which may be of another week if players were fetched again.
+
+        """
+        rows = []
+        for player in players:
+            if hasattr(player, 'stat_values'):
+                stats = zip(player.stat_ids, player.stat_values)
+            else:
+                player_stats = (player.player_stats if coverage is None
+                                else player.coverage_stats[coverage])
+                stats = [(int(s['stat_id']), _stat_value(s['value']))
+                         for s in player_stats['stats']]
+            rows.append((player.player_key, dict(stats)))
+
+        if stat_categories is not None:
+            stat_ids = [int(stat_id) for stat_id in stat_categories]
+        else:
+            stat_ids = []
+            seen = set()
+            for _, stats in rows:
+                for stat_id in stats:
+                    if stat_id not in seen:
+                        seen.add(stat_id)
+                        stat_ids.append(stat_id)
+
+        values = numpy.full((len(rows), len(stat_ids)), numpy.nan)
+        for i, (_, stats) in enumerate(rows):
+            values[i] = [stats.get(stat_id, numpy.nan) for stat_id in stat_ids]
+
+        return cls([key for key, _ in rows], stat_ids, values, stat_categories)
+
+    def __len__(self):
+        return len(self.player_keys)
+
+    def column(self, stat_id):
+        """The values of a stat for every player, as a 1-dimensional array."""
+        return self.values[:, self._columns[stat_id]]
+
+    def row(self, player_key):
+        """The values of every stat for a player, as a 1-dimensional array."""
+        return self.values[self._rows[player_key]]
+
+    def _higher_is_better(self, stat_id):
+        if stat_id not in self._categories:
+            return True
+        return self._categories[stat_id].sort_order
+
+    def zscores(self):
+        """
+        The number of standard deviations each value is from the mean of its
+        stat, ignoring missing values. When the stat categories are known, the
+        sign is flipped for stats where lower is better, so that a higher
+        z-score is always better.
+
+        Returns:
+            :class:`YahooStatsMatrix`
+
+        """
+        with numpy.errstate(invalid='ignore', divide='ignore'):
+            scores = ((self.values - numpy.nanmean(self.values, axis=0)) /
+                      numpy.nanstd(self.values, axis=0))
+        signs = numpy.array([1.0 if self._higher_is_better(s) else -1.0 for s in self.stat_ids])
+        return YahooStatsMatrix(self.player_keys, self.stat_ids, scores * signs,
+                                self.stat_categories)
+
+    def rank(self, stat_id):
+        """
+        The player keys ordered from best to worst in a stat, players without a
+        value are last.
+        """
+        column = self.column(stat_id)
+        if self._higher_is_better(stat_id):
+            column = -column
+        # nan sorts last.
+        return [self.player_keys[i] for i in numpy.argsort(column, kind='mergesort')]
+
+    def to_dataframe(self):
+        """:returns a pandas.DataFrame indexed by player key, with a column per stat ID"""
+        import pandas
+        return pandas.DataFrame(self.values, index=self.player_keys, columns=self.stat_ids)
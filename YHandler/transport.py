@@ -0,0 +1,194 @@
+from __future__ import absolute_import
+
+import datetime
+import hashlib
+import io
+import json
+import os
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+
+
+class SessionTransport(object):
+    """
+    Sends HTTP requests over a single pooled, keep-alive :class:`requests.Session`.
+
+    Every request made by a :class:`~YHandler.base.YahooFantasySports` handler
+    (and thus every resource that resolves back to it) goes through one of
+    these, so TCP and TLS connections are re-used across calls instead of being
+    re-established for each request.
+
+    Parameters:
+        ``pool_connections`` (:class:`int`):
+            The number of distinct hosts to keep connection pools for.
+        ``pool_maxsize`` (:class:`int`):
+            The maximum number of connections to keep open per host.
+        ``max_retries`` (:class:`int`):
+            The number of times to retry failed connections (not failed
+            responses).
+        ``timeout`` (:class:`float` or :class:`tuple`):
+            The default (connect, read) timeout in seconds for each request.
+        ``keep_alive`` (:class:`bool`):
+            Set to :const:`False` to close connections after each request.
+        ``compress`` (:class:`bool`):
+            Whether to ask the server for gzip/deflate encoded responses.
+
+    """
+    def __init__(self, pool_connections=4, pool_maxsize=10, max_retries=0,
+                 timeout=(3.05, 30), keep_alive=True, compress=True):
+        self.timeout = timeout
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_connections,
+                              pool_maxsize=pool_maxsize,
+                              max_retries=max_retries)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        if compress:
+            self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        else:
+            self.session.headers['Accept-Encoding'] = 'identity'
+        self.session.headers['Connection'] = 'keep-alive' if keep_alive else 'close'
+
+    def request(self, method, url, **kwargs):
+        """
+        Send a request, see :meth:`requests.Session.request` for the accepted
+        keyword arguments.
+        :returns Response object
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.request(method=method, url=url, **kwargs)
+
+    def close(self):
+        """Close all pooled connections."""
+        self.session.close()
+
+
+# Token requests aren't recorded, so that credentials never end up on disk.
+LOGIN_URL = 'https://api.login.yahoo.com/'
+
+
+def _recording_name(method, url, params=None, data=None):
+    """
+    The file name a request is recorded under, from its method, URL, (sorted)
+    query parameters and body. Authentication headers are not part of it, so a
+    recording replays regardless of the tokens used to make it.
+    """
+    if isinstance(data, dict):
+        data = sorted(data.items())
+    key = json.dumps([method.upper(), url, sorted((params or {}).items()), data or None])
+    return hashlib.sha1(key.encode('utf-8')).hexdigest() + '.json'
+
+
+class RecordingTransport(object):
+    """
+    Sends requests through another transport, saving each response to a
+    directory (one JSON file per distinct request) so that it can be replayed
+    later by a :class:`ReplayTransport`.
+
+    Parameters:
+        ``directory`` (:class:`str`):
+            Where to store the recordings, created if it doesn't exist.
+            Recording the same request again overwrites it.
+        ``transport``:
+            The transport actually sending requests, defaults to a new
+            :class:`SessionTransport`.
+        ``exclude`` (:class:`tuple` of :class:`str`):
+            URL prefixes which are sent but not recorded, by default the token
+            requests.
+
+    """
+    def __init__(self, directory, transport=None, exclude=(LOGIN_URL,)):
+        if transport is None:
+            transport = SessionTransport()
+        self.directory = directory
+        self.transport = transport
+        self.exclude = tuple(exclude)
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+    def request(self, method, url, **kwargs):
+        response = self.transport.request(method, url, **kwargs)
+        if url.startswith(self.exclude):
+            return response
+
+        # Reading the content consumes a streamed body, so swap in a copy of it
+        # for callers which read the raw response.
+        content = response.content
+        response.raw = io.BytesIO(content)
+
+        record = {
+            'method': method.upper(),
+            'url': url,
+            'params': kwargs.get('params'),
+            'status_code': response.status_code,
+            'reason': response.reason,
+            # The body is stored decoded.
+            'headers': dict((k, v) for k, v in response.headers.items()
+                            if k.lower() not in ('content-encoding', 'content-length',
+                                                 'transfer-encoding')),
+            'body': content.decode('utf-8'),
+        }
+        name = _recording_name(method, url, kwargs.get('params'), kwargs.get('data'))
+        with open(os.path.join(self.directory, name), 'w') as f:
+            json.dump(record, f, indent=2, sort_keys=True)
+
+        return response
+
+    def close(self):
+        self.transport.close()
+
+
+class ReplayTransport(object):
+    """
+    Answers requests from the recordings of a :class:`RecordingTransport`,
+    without touching the network. Replays are deterministic: the same request
+    always gets the same response.
+
+    Parameters:
+        ``directory`` (:class:`str`):
+            Where the recordings are stored.
+        ``latency`` (:class:`float` or callable):
+            Seconds to wait before each response, to simulate the network, or a
+            function returning the number of seconds (e.g. to add jitter).
+
+    Raises :class:`KeyError` for a request which wasn't recorded.
+    """
+    def __init__(self, directory, latency=0):
+        self.directory = directory
+        self.latency = latency
+
+    def _load(self, method, url, params, data):
+        name = _recording_name(method, url, params, data)
+        try:
+            with open(os.path.join(self.directory, name)) as f:
+                return json.load(f)
+        except IOError:
+            raise KeyError('No recording of %s %s' % (method.upper(), url))
+
+    def request(self, method, url, **kwargs):
+        record = self._load(method, url, kwargs.get('params'), kwargs.get('data'))
+
+        latency = self.latency() if callable(self.latency) else self.latency
+        if latency:
+            time.sleep(latency)
+
+        content = record['body'].encode('utf-8')
+        response = requests.Response()
+        response.status_code = record['status_code']
+        response.reason = record.get('reason')
+        response.headers = CaseInsensitiveDict(record['headers'])
+        response.encoding = 'utf-8'
+        response.url = url
+        response._content = content
+        response.raw = io.BytesIO(content)
+        response.elapsed = datetime.timedelta(seconds=latency)
+        return response
+
+    def close(self):
+        pass
@@ -0,0 +1,152 @@
+import copy
+import ctypes
+import ctypes.util
+import gc
+import os
+import sys
+
+import pytest
+
+from payloads import deep_getsizeof
+
+try:
+    import tracemalloc
+except ImportError:
+    tracemalloc = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+ROUNDS = 20
+
+try:
+    _libc = ctypes.CDLL(ctypes.util.find_library('c'))
+    _libc.malloc_trim
+except (OSError, AttributeError):
+    # Only glibc has malloc_trim.
+    _libc = None
+
+# The unit of ru_maxrss, in bytes.
+_MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def _tracemalloc_peak(func, data):
+    tracemalloc.start()
+    try:
+        func(data)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+# How much the resident memory grows once the free memory Python holds on to
+# has been used up.
+_FILL_GROWTH = 4 * 1024 * 1024
+
+
+def _maxrss():
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * _MAXRSS_UNIT
+
+
+def _rss():
+    """The current resident memory, or None if it isn't known."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * resource.getpagesize()
+    except (IOError, OSError):
+        return None
+
+
+def _use_free_memory():
+    """
+    Use up the memory which Python freed but keeps for reuse (small objects
+    of every size), so that a call's allocations grow the resident memory.
+    :returns the objects, which must be kept alive
+    """
+    filler = []
+    start = _rss()
+    if start is None:
+        return filler
+    sizes = range(0, 512, 8)
+    while _rss() - start < _FILL_GROWTH:
+        filler.extend(' ' * n for n in sizes for _ in range(100))
+    return filler
+
+
+def _rss_peak(func, data):
+    """
+    The growth of the peak resident memory while calling func(data), measured
+    in a forked child whose peak starts out at the memory currently in use.
+    It's rounded to pages, and memory freed during the call and reused counts
+    once. :returns None if it can't be measured
+    """
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:
+        try:
+            os.close(read_fd)
+            # Return the memory freed by earlier calls to the system (or use
+            # it up), so the call can't reuse it unnoticed. Then, where
+            # supported, reset the peak to the current size.
+            gc.collect()
+            if _libc is not None:
+                _libc.malloc_trim(0)
+            filler = _use_free_memory()
+            try:
+                with open('/proc/self/clear_refs', 'w') as f:
+                    f.write('5')
+            except (IOError, OSError):
+                pass
+            before = _maxrss()
+            func(data)
+            del filler
+            os.write(write_fd, str(_maxrss() - before).encode('ascii'))
+        finally:
+            os._exit(0)
+
+    os.close(write_fd)
+    with os.fdopen(read_fd) as f:
+        output = f.read()
+    os.waitpid(pid, 0)
+    return int(output) if output else None
+
+
+@pytest.fixture
+def measure(benchmark):
+    """
+    Benchmark ``func`` on a fresh deep copy of ``payload`` each round (parsing
+    modifies the payload in place), and record in ``extra_info``:
+
+    * ``items_per_second``, the throughput in ``items`` handled per call.
+    * ``retained_bytes``, the deep size of the result.
+    * ``peak_bytes``, the peak memory allocated during a call, via tracemalloc
+      on Python 3. Otherwise (on POSIX) the growth of the peak resident memory
+      of a forked process making the call, which is coarser.
+    """
+    def run(func, payload, items=1):
+        # Before the rounds, whose freed memory the call could otherwise reuse
+        # without the resident memory growing.
+        data = copy.deepcopy(payload)
+        peak = None
+        if tracemalloc is not None:
+            peak = _tracemalloc_peak(func, data)
+        elif resource is not None and hasattr(os, 'fork'):
+            peak = _rss_peak(func, data)
+        del data
+
+        result = benchmark.pedantic(
+            func, setup=lambda: ((copy.deepcopy(payload),), {}), rounds=ROUNDS)
+
+        benchmark.extra_info['items'] = items
+        # There are no stats when run with --benchmark-disable.
+        if benchmark.stats is not None:
+            benchmark.extra_info['items_per_second'] = items / benchmark.stats.stats.mean
+        benchmark.extra_info['retained_bytes'] = deep_getsizeof(result)
+        if peak is not None:
+            benchmark.extra_info['peak_bytes'] = peak
+
+        return result
+
+    return run
@@ -0,0 +1,132 @@
+"""
+Synthetic API payloads shaped like real responses, sized like the largest ones
+seen in practice.
+"""
+import sys
+
+# Roughly the number of players in an NHL or NFL player pool.
+POOL_SIZE = 1500
+
+# The largest league size, and a typical roster size.
+NUM_TEAMS = 20
+ROSTER_SIZE = 16
+
+# The number of stats in a full season stat line, and of stat categories in a game.
+NUM_STATS = 30
+NUM_STAT_CATEGORIES = 60
+
+
+def player_api(i, num_stats=19, selected_position=False):
+    """A player, as it appears in a players collection with stats."""
+    metadata = [
+        {'player_key': '371.p.{0}'.format(i)},
+        {'player_id': str(i)},
+        {'name': {'full': 'Player {0}'.format(i), 'first': 'Player',
+                  'last': str(i), 'ascii_first': 'Player', 'ascii_last': str(i)}},
+        {'editorial_player_key': 'nhl.p.{0}'.format(i)},
+        {'editorial_team_key': 'nhl.t.1'},
+        {'editorial_team_full_name': 'Boston Bruins'},
+        {'editorial_team_abbr': 'Bos'},
+        {'uniform_number': str(i % 99)},
+        {'display_position': 'C,LW'},
+        {'headshot': {'url': 'https://example.com/{0}.png'.format(i), 'size': 'small'}},
+        {'image_url': 'https://example.com/{0}.png'.format(i)},
+        {'is_undroppable': '0'},
+        {'position_type': 'P'},
+        {'eligible_positions': [{'position': 'C'}, {'position': 'LW'}]},
+        [],
+    ]
+    player = [
+        metadata,
+        {'player_stats': {'0': {'coverage_type': 'season', 'season': '2016'},
+                          'stats': [{'stat': {'stat_id': str(s), 'value': str(i * s % 50)}}
+                                    for s in range(1, num_stats + 1)]}},
+    ]
+    if selected_position:
+        player.insert(1, {'selected_position': [
+            {'coverage_type': 'date'}, {'date': '2016-10-12'}, {'position': 'C'}]})
+    return player
+
+
+def wrap(items):
+    """Wrap a list the way the API does, as a count and an object per index."""
+    result = dict((str(i), item) for i, item in enumerate(items))
+    result['count'] = len(items)
+    return result
+
+
+def player_pool(size=POOL_SIZE, num_stats=NUM_STATS):
+    """A players collection of a whole player pool, with full season stats."""
+    return wrap([{'player': player_api(i, num_stats)} for i in range(size)])
+
+
+def roster_api(team, size=ROSTER_SIZE):
+    """The roster sub-resource of a team."""
+    return {
+        'coverage_type': 'date',
+        'date': '2016-10-12',
+        '0': {'players': wrap([
+            {'player': player_api(team * size + i, selected_position=True)}
+            for i in range(size)])},
+    }
+
+
+def team_api(team):
+    """A team, as it appears in a teams collection (once unwrapped)."""
+    return {
+        'team_key': '371.l.1234.t.{0}'.format(team),
+        'team_id': str(team),
+        'name': 'Team {0}'.format(team),
+        'url': 'https://example.com/t/{0}'.format(team),
+        'team_logos': [{'team_logo': {'size': 'large', 'url': 'https://example.com/{0}.png'.format(team)}}],
+        'waiver_priority': team,
+        'number_of_moves': '3',
+        'number_of_trades': 0,
+        'managers': [{'manager': {'manager_id': str(team), 'nickname': 'Manager {0}'.format(team),
+                                  'guid': 'GUID{0}'.format(team)}}],
+    }
+
+
+def league_rosters(num_teams=NUM_TEAMS, size=ROSTER_SIZE):
+    """The rosters of every team in a league."""
+    return [roster_api(team, size) for team in range(num_teams)]
+
+
+def stat_category_api(i):
+    """A stat category of a game, every fifth one is a composite stat."""
+    category = {
+        'stat_id': i,
+        'name': 'Stat {0}'.format(i),
+        'display_name': 'S{0}'.format(i),
+        'sort_order': str(i % 2),
+        'position_types': [{'position_type': 'P'}, {'position_type': 'G'}],
+    }
+    if i % 5 == 0:
+        category['is_composite_stat'] = 1
+        category['base_stats'] = [{'base_stat': {'stat_id': str(i - j)}} for j in (1, 2)]
+    return category
+
+
+def stat_categories(num=NUM_STAT_CATEGORIES):
+    return [stat_category_api(i) for i in range(1, num + 1)]
+
+
+def deep_getsizeof(obj, seen=None):
+    """The size of an object and everything it references, in bytes."""
+    if seen is None:
+        seen = set()
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_getsizeof(k, seen) + deep_getsizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_getsizeof(i, seen) for i in obj)
+    elif hasattr(obj, '__dict__'):
+        size += deep_getsizeof(obj.__dict__, seen)
+    if hasattr(obj, '__slots__'):
+        size += sum(deep_getsizeof(getattr(obj, s), seen)
+                    for s in obj.__slots__ if hasattr(obj, s))
+    return size
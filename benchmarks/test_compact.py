@@ -0,0 +1,30 @@
+"""
+Memory use and attribute access of the compact models against the resource
+classes, run with ``py.test benchmarks/test_compact.py`` (requires
+pytest-benchmark). The deep size of 1000 players is reported in ``extra_info``.
+"""
+from payloads import deep_getsizeof as _deep_getsizeof, player_api as _player_api
+
+from YHandler.resources import CompactPlayer, YahooPlayerResource
+
+NUM_PLAYERS = 1000
+
+
+def test_resource_memory(benchmark):
+    players = benchmark(lambda: [YahooPlayerResource(_player_api(i), None) for i in range(NUM_PLAYERS)])
+    benchmark.extra_info['deep_size_bytes'] = _deep_getsizeof(players)
+
+
+def test_compact_memory(benchmark):
+    players = benchmark(lambda: [CompactPlayer.from_api(_player_api(i)) for i in range(NUM_PLAYERS)])
+    benchmark.extra_info['deep_size_bytes'] = _deep_getsizeof(players)
+
+
+def test_resource_attribute_access(benchmark):
+    player = YahooPlayerResource(_player_api(1), None)
+    benchmark(lambda: (player.player_key, player.display_position, player.eligible_positions))
+
+
+def test_compact_attribute_access(benchmark):
+    player = CompactPlayer.from_api(_player_api(1))
+    benchmark(lambda: (player.player_key, player.display_position, player.eligible_positions))
@@ -0,0 +1,45 @@
+"""
+Throughput and memory of turning decoded responses into resources, run with
+``py.test benchmarks/test_parsing.py`` (requires pytest-benchmark). Save runs
+with ``--benchmark-autosave`` and compare them with ``--benchmark-compare`` to
+track these over time.
+"""
+from payloads import (NUM_STAT_CATEGORIES, NUM_TEAMS, POOL_SIZE, ROSTER_SIZE, league_rosters,
+                      player_pool, stat_categories)
+
+from YHandler.resources import YahooPlayerResource, YahooRosterResource
+from YHandler.resources.base import YahooApiData
+from YHandler.resources.game import YahooGameStat
+
+
+def test_unwrap_array(measure):
+    measure(YahooApiData._unwrap_array, player_pool(), POOL_SIZE)
+
+
+def test_unwrap_dict(measure):
+    metadata = [p['player'][0] for p in YahooApiData._unwrap_array(player_pool())]
+    measure(lambda data: [YahooApiData._unwrap_dict(m) for m in data], metadata, POOL_SIZE)
+
+
+def test_flatten_array(measure):
+    stats = [p['player'][1]['player_stats']['stats']
+             for p in YahooApiData._unwrap_array(player_pool())]
+    measure(lambda data: [YahooApiData._flatten_array(s, 'stat') for s in data], stats, POOL_SIZE)
+
+
+def test_player_pool(measure):
+    """A whole player pool with full season stats."""
+    measure(lambda data: [YahooPlayerResource(p['player'], None)
+                          for p in YahooApiData._unwrap_array(data)],
+            player_pool(), POOL_SIZE)
+
+
+def test_league_rosters(measure):
+    """Every roster of a 20 team league."""
+    measure(lambda data: [YahooRosterResource(r, None) for r in data],
+            league_rosters(), NUM_TEAMS * ROSTER_SIZE)
+
+
+def test_game_stats(measure):
+    measure(lambda data: [YahooGameStat(s) for s in data],
+            stat_categories(), NUM_STAT_CATEGORIES)
@@ -0,0 +1,58 @@
+"""
+Pickling a whole league snapshot (20 teams and their rosters), as when sending
+it to a process pool or storing it, run with
+``py.test benchmarks/test_serialization.py`` (requires pytest-benchmark). The
+pickled size is reported in ``extra_info``.
+"""
+try:
+    import cPickle as pickle
+except ImportError:
+    import pickle
+
+from payloads import NUM_TEAMS, ROSTER_SIZE, league_rosters, team_api
+
+from YHandler.resources import (ResourceContext, YahooLeagueResource, YahooRosterResource,
+                                YahooTeamResource)
+from YHandler.resources.league import YahooLeagueSnapshot
+
+
+class _Handler(object):
+    """Stands in for a YahooFantasySports, which must never be pickled."""
+    def __init__(self):
+        self._context = ResourceContext(self)
+
+    def _canonical(self, resource, key):
+        return resource
+
+    def __reduce__(self):
+        raise TypeError('the handler was pickled')
+
+
+def _snapshot():
+    league = YahooLeagueResource({'league_key': '371.l.1234', 'name': 'League'}, _Handler())
+    teams = []
+    for i, roster in enumerate(league_rosters()):
+        team = YahooTeamResource(team_api(i), league)
+        team._api_dict['roster'] = YahooRosterResource(roster, team)
+        teams.append(team)
+    return YahooLeagueSnapshot({'league': league, 'teams': teams, 'standings': teams,
+                                'scoreboard': []})
+
+
+def _report(benchmark, data):
+    benchmark.extra_info['pickled_bytes'] = len(data)
+    if benchmark.stats is not None:
+        benchmark.extra_info['players_per_second'] = (
+            NUM_TEAMS * ROSTER_SIZE / benchmark.stats.stats.mean)
+
+
+def test_dumps(benchmark):
+    snapshot = _snapshot()
+    data = benchmark(pickle.dumps, snapshot, pickle.HIGHEST_PROTOCOL)
+    _report(benchmark, data)
+
+
+def test_loads(benchmark):
+    data = pickle.dumps(_snapshot(), pickle.HIGHEST_PROTOCOL)
+    benchmark(pickle.loads, data)
+    _report(benchmark, data)
@@ -0,0 +1,38 @@
+"""
+Signing cost per request, run with ``py.test benchmarks/test_signing.py``
+(requires pytest-benchmark).
+"""
+from requests import Request
+
+from YHandler.OAuth1Lite import OAuth1Lite, OAuth1Signer
+
+URL = 'https://fantasysports.yahooapis.com/fantasy/v2/league/371.l.1234/players;start=25;count=25?format=json'
+CREDENTIALS = ('consumer-key', 'consumer-secret', 'access-token', 'access-token-secret')
+
+
+def _prepared():
+    return Request('GET', URL).prepare()
+
+
+def test_oauth1lite(benchmark):
+    """The previous approach: a new OAuth1Lite for every request."""
+    def sign():
+        return OAuth1Lite(*CREDENTIALS)(_prepared())
+
+    benchmark(sign)
+
+
+def test_oauth1signer(benchmark):
+    """A single OAuth1Signer re-used across requests."""
+    signer = OAuth1Signer(*CREDENTIALS)
+
+    def sign():
+        return signer(_prepared())
+
+    benchmark(sign)
+
+
+def test_oauth1signer_sign_only(benchmark):
+    """Only computing the authorization header."""
+    signer = OAuth1Signer(*CREDENTIALS)
+    benchmark(signer.sign, URL, 'GET')
@@ -0,0 +1,48 @@
+"""
+Iterating collections through the lazy views against the copying helpers, run
+with ``py.test benchmarks/test_views.py`` (requires pytest-benchmark). Each
+pair handles the same data, ``peak_bytes`` shows what the copies
+cost.
+"""
+from payloads import NUM_STATS, POOL_SIZE, player_pool
+
+from YHandler.resources.base import ArrayView, DictView, YahooApiData
+
+
+def _consume(iterable):
+    for _ in iterable:
+        pass
+
+
+def test_unwrap_array(measure):
+    measure(lambda data: _consume(YahooApiData._unwrap_array(data)), player_pool(), POOL_SIZE)
+
+
+def test_array_view(measure):
+    measure(lambda data: _consume(ArrayView(data)), player_pool(), POOL_SIZE)
+
+
+def test_unwrap_and_flatten_array(measure):
+    """The stats of every player, as _parse_player_stats."""
+    measure(lambda data: [_consume(YahooApiData._flatten_array(
+                p['player'][1]['player_stats']['stats'], 'stat'))
+                for p in YahooApiData._unwrap_array(data)],
+            player_pool(), POOL_SIZE * NUM_STATS)
+
+
+def test_array_view_with_key(measure):
+    measure(lambda data: [_consume(ArrayView(p['player'][1]['player_stats']['stats'], 'stat'))
+                          for p in ArrayView(data)],
+            player_pool(), POOL_SIZE * NUM_STATS)
+
+
+def test_unwrap_dict(measure):
+    """Looking up a few fields of every player."""
+    measure(lambda data: [YahooApiData._unwrap_dict(p['player'][0])['player_key']
+                          for p in ArrayView(data)],
+            player_pool(), POOL_SIZE)
+
+
+def test_dict_view(measure):
+    measure(lambda data: [DictView(p['player'][0])['player_key'] for p in ArrayView(data)],
+            player_pool(), POOL_SIZE)
@@ -21,4 +21,11 @@ setup(name='YHandler',
             'requests',
             'lxml'
       ],
+      extras_require={
+            # Incremental parsing of large collections, see YHandler.decoding.
+            'ijson': ['ijson'],
+            # Faster decoding of whole responses.
+            'orjson': ['orjson'],
+            'ujson': ['ujson'],
+      },
       zip_safe=False)